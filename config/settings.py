@@ -1,5 +1,6 @@
 # config/settings.py
 
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -27,3 +28,11 @@ VECTOR_TOP_K = 5
 DEFAULT_RETRIEVAL_MODE = (
     "Baseline (Cypher)"  # options: "Baseline (Cypher)", "Embeddings", "Hybrid"
 )
+
+# DuckDB player-fixture facts store (built by scripts/create_facts_db.py)
+DUCKDB_PATH = os.getenv("DUCKDB_PATH", "./data/fpl_facts.duckdb")
+
+# Backend for intents that have a SQL template: "neo4j" or "duckdb".
+# DuckDB answers aggregations faster but returns no graph visualization data,
+# so it is opt-in.
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "neo4j")
@@ -0,0 +1,345 @@
+"""
+SQL Template Library
+--------------------
+
+SQL equivalents of the aggregation templates in template_library.py, run
+by the DuckDB backend (modules/duckdb_retriever.py) against the
+player_fixtures table built by scripts/create_facts_db.py.
+
+Every template takes the same parameters as its Cypher counterpart
+($player1, $season, ...) and returns the same columns. $stat_property and
+$limit are string-injected exactly as for Cypher.
+"""
+
+SQL_TEMPLATE_LIBRARY = {
+    # -----------------------------------------------------
+    # PLAYER PERFORMANCE & COMPARISON
+    # -----------------------------------------------------
+    # How do two players compare in total points?
+    "COMPARE_PLAYERS_BY_TOTAL_POINTS": """
+       WITH p1 AS (
+           SELECT $player1 AS player1, sum(total_points) AS player1_points
+           FROM player_fixtures WHERE player_name = $player1
+           GROUP BY player_name
+       ),
+       p2 AS (
+           SELECT $player2 AS player2, sum(total_points) AS player2_points
+           FROM player_fixtures WHERE player_name = $player2
+           GROUP BY player_name
+       )
+       SELECT player1, player1_points, player2, player2_points
+       FROM p1 CROSS JOIN p2
+       """,
+    # How do two players compare in a specific stat sum?
+    "COMPARE_PLAYERS_BY_SPECIFIC_STAT_TOTAL_ALL_TIME": """
+       WITH p1 AS (
+           SELECT $player1 AS player1, sum($stat_property) AS player1_sum_$stat_property
+           FROM player_fixtures WHERE player_name = $player1
+           GROUP BY player_name
+       ),
+       p2 AS (
+           SELECT $player2 AS player2, sum($stat_property) AS player2_sum_$stat_property
+           FROM player_fixtures WHERE player_name = $player2
+           GROUP BY player_name
+       )
+       SELECT player1, player1_sum_$stat_property, player2, player2_sum_$stat_property
+       FROM p1 CROSS JOIN p2
+       """,
+    # How do two players compare in a specific stat average?
+    "COMPARE_PLAYERS_BY_SPECIFIC_STAT_AVG": """
+       WITH p1 AS (
+           SELECT $player1 AS player1, avg($stat_property) AS player1_avg_$stat_property
+           FROM player_fixtures WHERE player_name = $player1
+           GROUP BY player_name
+       ),
+       p2 AS (
+           SELECT $player2 AS player2, avg($stat_property) AS player2_avg_$stat_property
+           FROM player_fixtures WHERE player_name = $player2
+           GROUP BY player_name
+       )
+       SELECT player1, player1_avg_$stat_property, player2, player2_avg_$stat_property
+       FROM p1 CROSS JOIN p2
+       """,
+    # What are the career stats totals for a player?
+    "PLAYER_CAREER_STATS_TOTALS": """
+       SELECT player_name AS player,
+              sum(total_points) AS total_points,
+              sum(goals_scored) AS career_goals,
+              sum(assists) AS career_assists,
+              sum(clean_sheets) AS career_clean_sheets,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1
+       GROUP BY player_name
+       """,
+    # What are the specific stat sum for a player?
+    "PLAYER_SPECIFIC_STAT_SUM": """
+       SELECT player_name AS player,
+              sum($stat_property) AS sum_$stat_property,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1
+       GROUP BY player_name
+       """,
+    # What are the specific stat avg for a player?
+    "PLAYER_SPECIFIC_STAT_AVG": """
+       SELECT player_name AS player,
+              avg($stat_property) AS avg_$stat_property,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1
+       GROUP BY player_name
+       """,
+    # What are the specific stat sum for a player in a specific season?
+    "PLAYER_SPECIFIC_STAT_SUM_SPECIFIC_SEASON": """
+       SELECT player_name AS player,
+              sum($stat_property) AS sum_$stat_property,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season
+       GROUP BY player_name
+       """,
+    # What are the specific stat avg for a player in a specific season?
+    "PLAYER_SPECIFIC_STAT_AVG_SPECIFIC_SEASON": """
+       SELECT player_name AS player,
+              avg($stat_property) AS avg_$stat_property,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season
+       GROUP BY player_name
+       """,
+    # Who are the top players by a given stat?
+    "TOP_PLAYERS_BY_STAT": """
+       SELECT player_name AS player, sum($stat_property) AS total_stat
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY total_stat DESC
+       LIMIT $limit
+       """,
+    # -----------------------------------------------------
+    # TOP PERFORMERS & LEADERBOARDS
+    # -----------------------------------------------------
+    # Who are the top players in a given position in total_points?
+    "TOP_PLAYERS_BY_POSITION_IN_POINTS": """
+       SELECT player_name AS player, sum(total_points) AS total_pts
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       HAVING bool_or(position = $position)
+       ORDER BY total_pts DESC
+       LIMIT $limit
+       """,
+    # Who are the top players in a given position by form?
+    "TOP_PLAYERS_BY_POSITION_IN_FORM": """
+       SELECT player_name AS player, avg(form) AS avg_form
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       HAVING bool_or(position = $position)
+       ORDER BY avg_form DESC
+       LIMIT $limit
+       """,
+    # Which players have the most stat in total?
+    "TOP_SUM_OF_SPECIFIC_STAT_LEADERS_ANY_POSITION": """
+       SELECT player_name AS player, sum($stat_property) AS stat_total
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY stat_total DESC
+       LIMIT $limit
+       """,
+    # Which players have the most stat in a specific position?
+    "TOP_SUM_OF_SPECIFIC_STAT_LEADERS_SPECIFIC_POSITION": """
+       SELECT player_name AS player, sum($stat_property) AS stat_total
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       HAVING bool_or(position = $position)
+       ORDER BY stat_total DESC
+       LIMIT $limit
+       """,
+    # Which players have the best average of stat?
+    "TOP_AVG_OF_SPECIFIC_STAT_LEADERS": """
+       SELECT player_name AS player, avg($stat_property) AS stat_avg
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY stat_avg DESC
+       LIMIT $limit
+       """,
+    # Which players have the best average of stat in a specific position?
+    "TOP_AVG_OF_SPECIFIC_STAT_LEADERS_SPECIFIC_POSITION": """
+       SELECT player_name AS player, avg($stat_property) AS stat_avg
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       HAVING bool_or(position = $position)
+       ORDER BY stat_avg DESC
+       LIMIT $limit
+       """,
+    # -----------------------------------------------------
+    # COMPOUND & DERIVED STATS
+    # -----------------------------------------------------
+    # Which players have the most yellow/red cards?
+    "MOST_CARDS_LEADERS": """
+       SELECT player_name AS player,
+              sum(yellow_cards) AS yellow_cards,
+              sum(red_cards) AS red_cards,
+              sum(yellow_cards) * 1 + sum(red_cards) * 3 AS disciplinary_score
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY disciplinary_score DESC
+       LIMIT $limit
+       """,
+    # Which players have the most goal contributions (goals + assists)?
+    "MOST_GOAL_CONTRIBUTIONS": """
+       SELECT player_name AS player,
+              sum(goals_scored) AS goals,
+              sum(assists) AS assists,
+              sum(goals_scored) + sum(assists) AS goal_contributions
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY goal_contributions DESC
+       LIMIT $limit
+       """,
+    # Which players have the best points per minute ratio?
+    # (integer division, as in the Cypher template)
+    "POINTS_PER_MINUTE_LEADERS": """
+       SELECT player_name AS player,
+              sum(total_points) // sum(minutes) AS points_per_minute,
+              sum(total_points) AS total_points,
+              sum(minutes) AS total_minutes
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       HAVING sum(total_points) > 0 AND sum(minutes) > 0
+       ORDER BY points_per_minute DESC
+       LIMIT $limit
+       """,
+    # What is the points per minute ratio for a specific player?
+    "PLAYER_POINTS_PER_MINUTE": """
+       SELECT sum(total_points) // sum(minutes) AS points_per_minute,
+              sum(total_points) AS total_points,
+              sum(minutes) AS total_minutes
+       FROM player_fixtures
+       WHERE player_name = $player1
+       HAVING sum(total_points) > 0 AND sum(minutes) > 0
+       """,
+    # What is the points per minute ratio for a specific player in a specific season?
+    "PLAYER_POINTS_PER_MINUTE_SPECIFIC_SEASON": """
+       SELECT sum(total_points) // sum(minutes) AS points_per_minute,
+              sum(total_points) AS total_points,
+              sum(minutes) AS total_minutes
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season
+       HAVING sum(total_points) > 0 AND sum(minutes) > 0
+       """,
+    # What is the total number of cards for a specific player?
+    "PLAYER_TOTAL_CARDS": """
+       SELECT coalesce(sum(yellow_cards), 0) AS yellow_cards,
+              coalesce(sum(red_cards), 0) AS red_cards,
+              coalesce(sum(yellow_cards) * 1 + sum(red_cards) * 3, 0) AS disciplinary_score
+       FROM player_fixtures
+       WHERE player_name = $player1
+       """,
+    # What is the total number of goal contributions for a specific player?
+    "PLAYER_GOAL_CONTRIBUTIONS": """
+       SELECT coalesce(sum(goals_scored), 0) AS goals,
+              coalesce(sum(assists), 0) AS assists,
+              coalesce(sum(goals_scored) + sum(assists), 0) AS goal_contributions
+       FROM player_fixtures
+       WHERE player_name = $player1
+       """,
+    # What is the total number of goal contributions for a specific player in a specific season?
+    "PLAYER_GOAL_CONTRIBUTIONS_SPECIFIC_SEASON": """
+       SELECT coalesce(sum(goals_scored), 0) AS goals,
+              coalesce(sum(assists), 0) AS assists,
+              coalesce(sum(goals_scored) + sum(assists), 0) AS goal_contributions
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season
+       """,
+    # What is the total number of cards for a specific player in a specific season?
+    "PLAYER_TOTAL_CARDS_SPECIFIC_SEASON": """
+       SELECT coalesce(sum(yellow_cards), 0) AS yellow_cards,
+              coalesce(sum(red_cards), 0) AS red_cards,
+              coalesce(sum(yellow_cards) * 1 + sum(red_cards) * 3, 0) AS disciplinary_score
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season
+       """,
+    # -----------------------------------------------------
+    # TEAM ANALYSIS & AGGREGATES
+    # -----------------------------------------------------
+    # How many points has a player scored against a specific team?
+    "PLAYER_POINTS_VS_SPECIFIC_TEAM": """
+       SELECT player_name AS player,
+              $team1 AS opponent,
+              sum(total_points) AS total_points_vs_opponent,
+              count(*) AS matches_played
+       FROM player_fixtures
+       WHERE player_name = $player1 AND opponent = $team1
+       GROUP BY player_name
+       """,
+    # -----------------------------------------------------
+    # PLAYER APPEARANCES, SPLITS & CONSISTENCY
+    # -----------------------------------------------------
+    # What is the maximum stat a player has achieved in a single match?
+    "PLAYER_MAX_SPECIFIC_STAT_SINGLE_MATCH": """
+       SELECT max($stat_property) AS max_$stat_property
+       FROM player_fixtures
+       WHERE player_name = $player1
+       """,
+    # How many fixtures in a specific season has a player appeared in?
+    "PLAYER_FIXTURE_COUNT_SPECIFIC_SEASON": """
+       SELECT count(*) AS appearances_in_season
+       FROM player_fixtures
+       WHERE player_name = $player1 AND season = $season AND minutes > 0
+       """,
+    # How many fixtures in total has a player appeared?
+    "PLAYER_FIXTURE_COUNT_TOTAL": """
+       SELECT count(*) AS appearances_in_season
+       FROM player_fixtures
+       WHERE player_name = $player1 AND minutes > 0
+       """,
+    # Against which teams has a player scored the most points?
+    "PLAYER_BEST_PERFORMANCE_AGAINST_WHICH_OPPONENTS": """
+       SELECT opponent, sum(total_points) AS points
+       FROM player_fixtures
+       WHERE player_name = $player1
+       GROUP BY opponent
+       ORDER BY points DESC
+       LIMIT $limit
+       """,
+    # Against which teams has a player scored the fewest points?
+    "PLAYER_WORST_PERFORMANCE_AGAINST_WHICH_OPPONENTS": """
+       SELECT opponent, sum(total_points) AS points
+       FROM player_fixtures
+       WHERE player_name = $player1
+       GROUP BY opponent
+       ORDER BY points ASC
+       LIMIT $limit
+       """,
+    # Which position has the best average points?
+    "POSITION_BEST_AVG_POINTS": """
+       WITH plays_as AS (
+           SELECT DISTINCT player_name, player_element, position FROM player_fixtures
+       )
+       SELECT pa.position AS position, avg(pf.total_points) AS avg_points
+       FROM plays_as pa
+       JOIN player_fixtures pf USING (player_name, player_element)
+       WHERE pf.minutes > 0
+       GROUP BY pa.position
+       ORDER BY avg_points DESC
+       """,
+    # How many players are there in each position?
+    "POSITION_PLAYERS_COUNT": """
+       WITH plays_as AS (
+           SELECT DISTINCT player_name, player_element, position FROM player_fixtures
+       )
+       SELECT position, count(*) AS players
+       FROM plays_as
+       GROUP BY position
+       """,
+    # Who are the least consistent players (highest stdev)?
+    # (Cypher's stdev is the sample stdev and returns 0 for a single value)
+    "LEAST_CONSISTENT_PLAYERS": """
+       SELECT player_name AS player,
+              coalesce(stddev_samp(total_points), 0) AS inconsistency
+       FROM player_fixtures
+       GROUP BY player_name, player_element
+       ORDER BY inconsistency DESC
+       LIMIT $limit
+       """,
+}
@@ -17,12 +17,11 @@ CYPHER_TEMPLATE_LIBRARY = {
     # What are the stats for a player in a specific gameweek in a specific season? tested
     "PLAYER_STATS_GW_SEASON": """
       MATCH (p:Player {player_name: $player1})
-         -[r:PLAYED_IN]->
-         (f:Fixture)<-[gw_rel:HAS_FIXTURE]-(gw:Gameweek {GW_number: $gw})
-      WHERE gw.season = $season
+         -[r:PLAYED_IN {season: $season, GW_number: $gw}]->
+         (f:Fixture)
       RETURN p.player_name AS player,
-         gw.season AS season,
-         gw.GW_number AS gw,
+         r.season AS season,
+         r.GW_number AS gw,
          r.total_points AS total_points,
          r.goals_scored AS goals_scored,
          r.assists AS assists,
@@ -37,11 +36,9 @@ CYPHER_TEMPLATE_LIBRARY = {
     # How do two players compare in total points? tested
     "COMPARE_PLAYERS_BY_TOTAL_POINTS": """
        MATCH (p1:Player {player_name: $player1})
-       OPTIONAL MATCH (p1)-[r1:PLAYED_IN]->(:Fixture)
-       WITH $player1 AS player1_name, coalesce(sum(r1.total_points), 0) AS p1_pts
+       WITH $player1 AS player1_name, coalesce(sum(p1.sum_total_points), 0) AS p1_pts
        MATCH (p2:Player {player_name: $player2})
-       OPTIONAL MATCH (p2)-[r2:PLAYED_IN]->(:Fixture)
-       WITH player1_name, p1_pts, $player2 AS player2_name, coalesce(sum(r2.total_points), 0) AS p2_pts
+       WITH player1_name, p1_pts, $player2 AS player2_name, coalesce(sum(p2.sum_total_points), 0) AS p2_pts
        RETURN
               player1_name AS player1,
               p1_pts AS player1_points,
@@ -51,11 +48,9 @@ CYPHER_TEMPLATE_LIBRARY = {
     # How do two players compare in a specific stat sum? tested
     "COMPARE_PLAYERS_BY_SPECIFIC_STAT_TOTAL_ALL_TIME": """
        MATCH (p1:Player {player_name: $player1})
-       OPTIONAL MATCH (p1)-[r1:PLAYED_IN]->(:Fixture)
-       WITH $player1 AS player1_name, coalesce(sum(r1.$stat_property), 0) AS p1_sum_$stat_property
+       WITH $player1 AS player1_name, coalesce(sum(p1.sum_$stat_property), 0) AS p1_sum_$stat_property
        MATCH (p2:Player {player_name: $player2})
-       OPTIONAL MATCH (p2)-[r2:PLAYED_IN]->(:Fixture)
-       WITH player1_name, p1_sum_$stat_property, $player2 AS player2_name, coalesce(sum(r2.$stat_property), 0) AS p2_sum_$stat_property
+       WITH player1_name, p1_sum_$stat_property, $player2 AS player2_name, coalesce(sum(p2.sum_$stat_property), 0) AS p2_sum_$stat_property
        RETURN
               player1_name AS player1,
               p1_sum_$stat_property AS player1_sum_$stat_property,
@@ -65,11 +60,11 @@ CYPHER_TEMPLATE_LIBRARY = {
     # How do two players compare in a specific stat average? tested
     "COMPARE_PLAYERS_BY_SPECIFIC_STAT_AVG": """
        MATCH (p1:Player {player_name: $player1})
-       OPTIONAL MATCH (p1)-[r1:PLAYED_IN]->(:Fixture)
-       WITH $player1 AS player1_name, coalesce(avg(r1.$stat_property), 0) AS p1_avg_$stat_property
+       WITH $player1 AS player1_name, sum(p1.sum_$stat_property) AS p1_sum, sum(p1.matches_played) AS p1_matches
+       WITH player1_name, CASE WHEN p1_matches > 0 THEN toFloat(p1_sum) / p1_matches ELSE 0 END AS p1_avg_$stat_property
        MATCH (p2:Player {player_name: $player2})
-       OPTIONAL MATCH (p2)-[r2:PLAYED_IN]->(:Fixture)
-       WITH player1_name, p1_avg_$stat_property, $player2 AS player2_name, coalesce(avg(r2.$stat_property), 0) AS p2_avg_$stat_property
+       WITH player1_name, p1_avg_$stat_property, $player2 AS player2_name, sum(p2.sum_$stat_property) AS p2_sum, sum(p2.matches_played) AS p2_matches
+       WITH player1_name, p1_avg_$stat_property, player2_name, CASE WHEN p2_matches > 0 THEN toFloat(p2_sum) / p2_matches ELSE 0 END AS p2_avg_$stat_property
        RETURN
               player1_name AS player1,
               p1_avg_$stat_property AS player1_avg_$stat_property,
@@ -78,50 +73,50 @@ CYPHER_TEMPLATE_LIBRARY = {
        """,
     # What are the career stats totals for a player? tested
     "PLAYER_CAREER_STATS_TOTALS": """
-       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
+       MATCH (p:Player {player_name: $player1})
+       WHERE p.matches_played > 0
        RETURN p.player_name AS player,
-              sum(r.total_points) AS total_points,
-              sum(r.goals_scored) AS career_goals,
-              sum(r.assists) AS career_assists,
-              sum(r.clean_sheets) AS career_clean_sheets,
-              count(r) AS matches_played
+              sum(p.sum_total_points) AS total_points,
+              sum(p.sum_goals_scored) AS career_goals,
+              sum(p.sum_assists) AS career_assists,
+              sum(p.sum_clean_sheets) AS career_clean_sheets,
+              sum(p.matches_played) AS matches_played
        """,
     # What are the specific stat sum for a player? tested
     "PLAYER_SPECIFIC_STAT_SUM": """
-       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
+       MATCH (p:Player {player_name: $player1})
+       WHERE p.matches_played > 0
        RETURN p.player_name AS player,
-              sum(r.$stat_property) AS sum_$stat_property,
-              count(r) AS matches_played
+              sum(p.sum_$stat_property) AS sum_$stat_property,
+              sum(p.matches_played) AS matches_played
        """,
     # What are the specific stat avg for a player? tested
     "PLAYER_SPECIFIC_STAT_AVG": """
-       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
+       MATCH (p:Player {player_name: $player1})
+       WHERE p.matches_played > 0
        RETURN p.player_name AS player,
-              avg(r.$stat_property) AS avg_$stat_property,
-              count(r) AS matches_played
+              toFloat(sum(p.sum_$stat_property)) / sum(p.matches_played) AS avg_$stat_property,
+              sum(p.matches_played) AS matches_played
        """,
     # What are the specific stat sum for a player in a specific season? tested
     "PLAYER_SPECIFIC_STAT_SUM_SPECIFIC_SEASON": """
-      MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-      MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-      WHERE gw.season = $season
+      MATCH (p:Player {player_name: $player1})-[season_rel:HAS_SEASON_STATS]->(ps:PlayerSeason {season: $season})
       RETURN p.player_name AS player,
-         sum(r.$stat_property) AS sum_$stat_property,
-         count(r) AS matches_played
+         sum(ps.sum_$stat_property) AS sum_$stat_property,
+         sum(ps.matches_played) AS matches_played
       """,
     # What are the specific stat avg for a player in a specific season? tested
     "PLAYER_SPECIFIC_STAT_AVG_SPECIFIC_SEASON": """
-      MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-      MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-      WHERE gw.season = $season
+      MATCH (p:Player {player_name: $player1})-[season_rel:HAS_SEASON_STATS]->(ps:PlayerSeason {season: $season})
       RETURN p.player_name AS player,
-         avg(r.$stat_property) AS avg_$stat_property,
-         count(r) AS matches_played
+         toFloat(sum(ps.sum_$stat_property)) / sum(ps.matches_played) AS avg_$stat_property,
+         sum(ps.matches_played) AS matches_played
       """,
     # Who are the top players by a given stat? tested
     "TOP_PLAYERS_BY_STAT": """
-       MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.$stat_property) AS total_stat
+       MATCH (p:Player)
+       WHERE p.matches_played > 0
+       WITH p, p.sum_$stat_property AS total_stat
        RETURN p.player_name AS player, total_stat
        ORDER BY total_stat DESC
        LIMIT $limit
@@ -132,8 +127,8 @@ CYPHER_TEMPLATE_LIBRARY = {
     # Who are the top players in a given position in total_points? tested
     "TOP_PLAYERS_BY_POSITION_IN_POINTS": """
        MATCH (p:Player)-[pos_rel:PLAYS_AS]->(pos:Position {name: $position})
-       MATCH (p)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.total_points) AS total_pts
+       WHERE p.matches_played > 0
+       WITH p, p.sum_total_points AS total_pts
        RETURN p.player_name AS player, total_pts
        ORDER BY total_pts DESC
        LIMIT $limit
@@ -141,16 +136,17 @@ CYPHER_TEMPLATE_LIBRARY = {
     # Who are the top players in a given position by form? tested
     "TOP_PLAYERS_BY_POSITION_IN_FORM": """
        MATCH (p:Player)-[pos_rel:PLAYS_AS]->(pos:Position {name: $position})
-       MATCH (p)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, avg(r.form) AS avg_form
+       WHERE p.matches_played > 0
+       WITH p, toFloat(p.sum_form) / p.matches_played AS avg_form
        RETURN p.player_name AS player, avg_form
        ORDER BY avg_form DESC
        LIMIT $limit
     """,
     # Which players have the most stat in total? tested
     "TOP_SUM_OF_SPECIFIC_STAT_LEADERS_ANY_POSITION": """
-       MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.$stat_property) AS stat_total
+       MATCH (p:Player)
+       WHERE p.matches_played > 0
+       WITH p, p.sum_$stat_property AS stat_total
        RETURN p.player_name AS player, stat_total
        ORDER BY stat_total DESC
        LIMIT $limit
@@ -158,16 +154,17 @@ CYPHER_TEMPLATE_LIBRARY = {
     # Which players have the most stat in a specific position? tested
     "TOP_SUM_OF_SPECIFIC_STAT_LEADERS_SPECIFIC_POSITION": """
        MATCH (p:Player)-[pos_rel:PLAYS_AS]->(pos:Position {name: $position})
-       MATCH (p)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.$stat_property) AS stat_total
+       WHERE p.matches_played > 0
+       WITH p, p.sum_$stat_property AS stat_total
        RETURN p.player_name AS player, stat_total
        ORDER BY stat_total DESC
        LIMIT $limit
        """,
     # Which players have the best average of stat? tested
     "TOP_AVG_OF_SPECIFIC_STAT_LEADERS": """
-       MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, avg(r.$stat_property) AS stat_avg
+       MATCH (p:Player)
+       WHERE p.matches_played > 0
+       WITH p, toFloat(p.sum_$stat_property) / p.matches_played AS stat_avg
        RETURN p.player_name AS player, stat_avg
        ORDER BY stat_avg DESC
        LIMIT $limit
@@ -175,8 +172,8 @@ CYPHER_TEMPLATE_LIBRARY = {
     # Which players have the best average of stat in a specific position? tested
     "TOP_AVG_OF_SPECIFIC_STAT_LEADERS_SPECIFIC_POSITION": """
        MATCH (p:Player)-[pos_rel:PLAYS_AS]->(pos:Position {name: $position})
-       MATCH (p)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, avg(r.$stat_property) AS stat_avg
+       WHERE p.matches_played > 0
+       WITH p, toFloat(p.sum_$stat_property) / p.matches_played AS stat_avg
        RETURN p.player_name AS player, stat_avg
        ORDER BY stat_avg DESC
        LIMIT $limit
@@ -186,24 +183,26 @@ CYPHER_TEMPLATE_LIBRARY = {
     # -----------------------------------------------------
     # Which players have the most yellow/red cards? tested
     "MOST_CARDS_LEADERS": """
-       MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.yellow_cards) AS yellow_cards, sum(r.red_cards) AS red_cards
+       MATCH (p:Player)
+       WHERE p.matches_played > 0
+       WITH p, p.sum_yellow_cards AS yellow_cards, p.sum_red_cards AS red_cards
        RETURN p.player_name AS player, yellow_cards, red_cards, (yellow_cards * 1 + red_cards * 3) AS disciplinary_score
        ORDER BY disciplinary_score DESC
        LIMIT $limit
        """,
     # Which players have the most goal contributions (goals + assists)? tested
     "MOST_GOAL_CONTRIBUTIONS": """
-       MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-       WITH p, sum(r.goals_scored) AS goals, sum(r.assists) AS assists
+       MATCH (p:Player)
+       WHERE p.matches_played > 0
+       WITH p, p.sum_goals_scored AS goals, p.sum_assists AS assists
        RETURN p.player_name AS player, goals, assists, (goals + assists) AS goal_contributions
        ORDER BY goal_contributions DESC
        LIMIT $limit
        """,
     # Which players have the best points per minute ratio? tested
     "POINTS_PER_MINUTE_LEADERS": """
-      MATCH (p:Player)-[r:PLAYED_IN]->(:Fixture)
-      WITH p, sum(r.minutes) AS total_minutes, sum(r.total_points) AS total_points
+      MATCH (p:Player)
+      WITH p, p.sum_minutes AS total_minutes, p.sum_total_points AS total_points
       WHERE total_points > 0 AND total_minutes > 0
       RETURN p.player_name AS player,
             total_points / total_minutes AS points_per_minute,
@@ -214,8 +213,8 @@ CYPHER_TEMPLATE_LIBRARY = {
       """,
     # What is the points per minute ratio for a specific player? tested
     "PLAYER_POINTS_PER_MINUTE": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
-         WITH sum(r.minutes) AS total_minutes, sum(r.total_points) AS total_points
+         MATCH (p:Player {player_name: $player1})
+         WITH sum(p.sum_minutes) AS total_minutes, sum(p.sum_total_points) AS total_points
          WHERE total_points > 0 AND total_minutes > 0
          RETURN total_points / total_minutes AS points_per_minute,
                   total_points AS total_points,
@@ -223,10 +222,8 @@ CYPHER_TEMPLATE_LIBRARY = {
          """,
     # What is the points per minute ratio for a specific player in a specific season? tested
     "PLAYER_POINTS_PER_MINUTE_SPECIFIC_SEASON": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-         MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-         WHERE gw.season = $season
-         WITH sum(r.minutes) AS total_minutes, sum(r.total_points) AS total_points
+         MATCH (p:Player {player_name: $player1})-[season_rel:HAS_SEASON_STATS]->(ps:PlayerSeason {season: $season})
+         WITH sum(ps.sum_minutes) AS total_minutes, sum(ps.sum_total_points) AS total_points
          WHERE total_points > 0 AND total_minutes > 0
          RETURN total_points / total_minutes AS points_per_minute,
                   total_points AS total_points,
@@ -234,30 +231,26 @@ CYPHER_TEMPLATE_LIBRARY = {
          """,
     # What is the total number of cards for a specific player? tested
     "PLAYER_TOTAL_CARDS": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
-         WITH sum(r.yellow_cards) AS yellow_cards, sum(r.red_cards) AS red_cards
+         MATCH (p:Player {player_name: $player1})
+         WITH sum(p.sum_yellow_cards) AS yellow_cards, sum(p.sum_red_cards) AS red_cards
          RETURN yellow_cards, red_cards, (yellow_cards * 1 + red_cards * 3) AS disciplinary_score
          """,
     # What is the total number of goal contributions for a specific player? tested
     "PLAYER_GOAL_CONTRIBUTIONS": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(:Fixture)
-         WITH sum(r.goals_scored) AS goals, sum(r.assists) AS assists
+         MATCH (p:Player {player_name: $player1})
+         WITH sum(p.sum_goals_scored) AS goals, sum(p.sum_assists) AS assists
          RETURN goals, assists, (goals + assists) AS goal_contributions
          """,
     # What is the total number of goal contributions for a specific player in a specific season? tested
     "PLAYER_GOAL_CONTRIBUTIONS_SPECIFIC_SEASON": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-         MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-         WHERE gw.season = $season
-         WITH sum(r.goals_scored) AS goals, sum(r.assists) AS assists
+         MATCH (p:Player {player_name: $player1})-[season_rel:HAS_SEASON_STATS]->(ps:PlayerSeason {season: $season})
+         WITH sum(ps.sum_goals_scored) AS goals, sum(ps.sum_assists) AS assists
          RETURN goals, assists, (goals + assists) AS goal_contributions
          """,
     # What is the total number of cards for a specific player in a specific season? tested
     "PLAYER_TOTAL_CARDS_SPECIFIC_SEASON": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-         MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-         WHERE gw.season = $season
-         WITH sum(r.yellow_cards) AS yellow_cards, sum(r.red_cards) AS red_cards
+         MATCH (p:Player {player_name: $player1})-[season_rel:HAS_SEASON_STATS]->(ps:PlayerSeason {season: $season})
+         WITH sum(ps.sum_yellow_cards) AS yellow_cards, sum(ps.sum_red_cards) AS red_cards
          RETURN yellow_cards, red_cards, (yellow_cards * 1 + red_cards * 3) AS disciplinary_score
          """,
     # -----------------------------------------------------
@@ -265,11 +258,9 @@ CYPHER_TEMPLATE_LIBRARY = {
     # -----------------------------------------------------
     # How many points has a player scored against a specific team? tested
     "PLAYER_POINTS_VS_SPECIFIC_TEAM": """
-         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-         MATCH (t:Team {name: $team1})
-         MATCH (f)-[team_rel:HAS_HOME_TEAM|HAS_AWAY_TEAM]->(t)
+         MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN {opponent: $team1}]->(f:Fixture)
          RETURN p.player_name AS player,
-               t.name AS opponent,
+               r.opponent AS opponent,
                sum(r.total_points) AS total_points_vs_opponent,
                count(f) AS matches_played
        """,
@@ -279,8 +270,7 @@ CYPHER_TEMPLATE_LIBRARY = {
     # What are the last N fixtures and points for a player? tested
     "PLAYER_LAST_N_FIXTURES_PERFORMANCE": """
        MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-       OPTIONAL MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-       RETURN f.kickoff_time AS date, gw.GW_number AS gw, r.total_points
+       RETURN r.kickoff_time AS date, r.GW_number AS gw, r.total_points
        ORDER BY date DESC
        LIMIT $limit
      """,
@@ -294,33 +284,27 @@ CYPHER_TEMPLATE_LIBRARY = {
        """,
     # How many fixtures in a specific season has a player appeared in? tested
     "PLAYER_FIXTURE_COUNT_SPECIFIC_SEASON": """
-       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-       MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
-       WHERE gw.season = $season AND r.minutes > 0
+       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN {season: $season}]->(f:Fixture)
+       WHERE r.minutes > 0
        RETURN count(r) AS appearances_in_season
        """,
     # How many fixtures in total has a player appeared? tested
     "PLAYER_FIXTURE_COUNT_TOTAL": """
        MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-       MATCH (gw:Gameweek)-[gw_rel:HAS_FIXTURE]->(f)
          WHERE r.minutes > 0
        RETURN count(r) AS appearances_in_season
        """,
     # Against which teams has a player scored the most points? tested
     "PLAYER_BEST_PERFORMANCE_AGAINST_WHICH_OPPONENTS": """
       MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-      MATCH (f)-[team_rel:HAS_HOME_TEAM|HAS_AWAY_TEAM]->(t:Team)
-      WITH t, sum(r.total_points) AS points
+      RETURN r.opponent AS opponent, sum(r.total_points) AS points
       ORDER BY points DESC
-      SKIP 1        // skip the highest (player's own team)
-      LIMIT $limit   // $limit can be 5 to include 2nd-6th, or 1 to get the 6th only
-      RETURN t.name AS opponent, points
+      LIMIT $limit
       """,
     # Against which teams has a player scored the fewest points? tested
     "PLAYER_WORST_PERFORMANCE_AGAINST_WHICH_OPPONENTS": """
        MATCH (p:Player {player_name: $player1})-[r:PLAYED_IN]->(f:Fixture)
-       MATCH (f)-[team_rel:HAS_HOME_TEAM|HAS_AWAY_TEAM]->(t:Team)
-       RETURN t.name AS opponent, sum(r.total_points) AS points
+       RETURN r.opponent AS opponent, sum(r.total_points) AS points
        ORDER BY points ASC
        LIMIT $limit
        """,
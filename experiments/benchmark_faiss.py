@@ -0,0 +1,193 @@
+# experiments/benchmark_faiss.py
+
+"""
+Recall/latency/memory benchmark for approximate and quantized FAISS indexes.
+
+Builds quantized (float16, 8-bit SQ, PQ), IVF-Flat, IVF-PQ and HNSW indexes
+from the flat index written by scripts/generate_embeddings.py, and sweeps
+their search-time knobs. For each setting it reports recall@k against exact
+flat search, p50/p99 single-query latency, and index size with the memory
+saved relative to flat.
+
+A second table covers the vector property on Embedding nodes: bytes per
+vector and recall@k of a flat index rebuilt from each storage format.
+
+Queries are stored vectors with a little noise, so they land near real
+rows without matching them exactly.
+
+Usage:
+    python -m experiments.benchmark_faiss --model A
+    python -m experiments.benchmark_faiss --model B --queries 500 --k 10 --out experiments/faiss_benchmark.json
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+from dotenv import load_dotenv
+
+from modules.faiss_index import (
+    VECTOR_DTYPES,
+    build_index,
+    decode_vector,
+    encode_vectors,
+    flat_contents,
+    recall_at_k,
+    search_params,
+    timed_search,
+)
+
+load_dotenv()
+
+INDEX_PATHS = {
+    "A": os.getenv("FAISS_INDEX_A_PATH", "./embeddings_out/faiss_index_modelA.index"),
+    "B": os.getenv("FAISS_INDEX_B_PATH", "./embeddings_out/faiss_index_modelB.index"),
+}
+
+# (index type, build parameters, knob name, knob values swept at search time)
+CONFIGS = [
+    ("sq_fp16", {}, None, [None]),
+    ("sq8", {}, None, [None]),
+    ("pq", {}, None, [None]),
+    ("ivf_flat", {}, "nprobe", [1, 4, 8, 16, 32, 64]),
+    ("ivf_pq", {}, "nprobe", [4, 16, 64]),
+    ("hnsw", {"hnsw_m": 32}, "ef_search", [16, 32, 64, 128, 256]),
+]
+
+
+def make_queries(vectors, n, noise=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(n, len(vectors)), replace=False)]
+    queries = queries + rng.normal(0, noise, queries.shape).astype("float32")
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def index_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+
+def run_benchmark(flat, n_queries=200, k=5):
+    vectors, ids = flat_contents(flat)
+    queries = make_queries(vectors, n_queries)
+
+    truth, flat_ms = timed_search(flat, queries, k)
+    results = [
+        {
+            "index": "flat",
+            "params": {},
+            "recall": 1.0,
+            "p50_ms": float(np.percentile(flat_ms, 50)),
+            "p99_ms": float(np.percentile(flat_ms, 99)),
+            "build_s": 0.0,
+            "size_mb": index_bytes(flat) / 1e6,
+        }
+    ]
+
+    for index_type, build_kwargs, knob, values in CONFIGS:
+        start = time.perf_counter()
+        index = build_index(index_type, vectors, ids, **build_kwargs)
+        build_s = time.perf_counter() - start
+        size_mb = index_bytes(index) / 1e6
+
+        for value in values:
+            knobs = {knob: value} if knob else {}
+            params = search_params(index, **knobs)
+            found, ms = timed_search(index, queries, k, params=params)
+            results.append(
+                {
+                    "index": index_type,
+                    "params": {**build_kwargs, **knobs},
+                    "recall": recall_at_k(found, truth),
+                    "p50_ms": float(np.percentile(ms, 50)),
+                    "p99_ms": float(np.percentile(ms, 99)),
+                    "build_s": build_s,
+                    "size_mb": size_mb,
+                }
+            )
+    return results, storage_benchmark(vectors, ids, queries, truth, k)
+
+
+def storage_benchmark(vectors, ids, queries, truth, k):
+    """Size and recall of the Embedding node vector property per storage dtype"""
+    results = []
+    for dtype in VECTOR_DTYPES:
+        values = encode_vectors(vectors, dtype)
+        decoded = np.stack([decode_vector(value, dtype) for value in values])
+        # Neo4j stores float lists as float64 arrays
+        per_vector = vectors.shape[1] * 8 if dtype == "float32" else len(values[0])
+        found, _ = timed_search(build_index("flat", decoded, ids), queries, k)
+        results.append(
+            {
+                "dtype": dtype,
+                "bytes_per_vector": per_vector,
+                "size_mb": per_vector * len(vectors) / 1e6,
+                "recall": recall_at_k(found, truth),
+            }
+        )
+    return results
+
+
+def print_table(results, k):
+    flat_mb = results[0]["size_mb"]
+    print(
+        f"{'index':10} {'params':28} {f'recall@{k}':>9} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'build s':>8} {'MB':>8} {'saved':>6}"
+    )
+    for r in results:
+        params = ", ".join(f"{key}={val}" for key, val in r["params"].items())
+        saved = 1 - r["size_mb"] / flat_mb
+        print(
+            f"{r['index']:10} {params:28} {r['recall']:9.3f} {r['p50_ms']:8.3f} "
+            f"{r['p99_ms']:8.3f} {r['build_s']:8.1f} {r['size_mb']:8.1f} {saved:6.0%}"
+        )
+
+
+def print_storage_table(storage, k):
+    base_mb = storage[0]["size_mb"]
+    print(
+        f"\n{'node vector':12} {'bytes/vec':>9} {'MB':>8} {'saved':>6} {f'recall@{k}':>9}"
+    )
+    for r in storage:
+        saved = 1 - r["size_mb"] / base_mb
+        print(
+            f"{r['dtype']:12} {r['bytes_per_vector']:9} {r['size_mb']:8.1f} "
+            f"{saved:6.0%} {r['recall']:9.3f}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Recall@k and latency of approximate FAISS indexes vs flat."
+    )
+    parser.add_argument("--model", choices=["A", "B"], default="A")
+    parser.add_argument("--index", default=None, help="Flat index path override")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    path = args.index or INDEX_PATHS[args.model]
+    flat = faiss.read_index(path)
+    print(f"Loaded {path}: {flat.ntotal} vectors, dim {flat.d}\n")
+
+    results, storage = run_benchmark(flat, n_queries=args.queries, k=args.k)
+    print_table(results, args.k)
+    print_storage_table(storage, args.k)
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"indexes": results, "node_vectors": storage}, indent=2)
+        )
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
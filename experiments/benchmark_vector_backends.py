@@ -0,0 +1,154 @@
+# experiments/benchmark_vector_backends.py
+
+"""
+Latency, recall and memory of the two vector_search backends.
+
+    faiss  search the in-process FAISS index, then resolve the hits with one
+           Neo4j read (_fetch_hits)
+    neo4j  one query against the Neo4j vector index that returns hits,
+           sources and neighbours together (generate_embeddings.py --vector-index)
+
+Both run on the same query vectors, stored vectors with a little noise as in
+benchmark_faiss.py. Latency is end to end, search plus resolution. recall@k
+is measured against exact search over the flat index. Memory is what each app
+process holds for the FAISS path (index + mapping) against the vectors Neo4j
+stores once on the server for all workers.
+
+Usage:
+    python -m experiments.benchmark_vector_backends --model A
+    python -m experiments.benchmark_vector_backends --model B --queries 100 --k 10 --out experiments/vector_backends.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Both paths are measured, so the FAISS indexes must be loaded
+os.environ["VECTOR_BACKEND"] = "faiss"
+
+from experiments.benchmark_faiss import (  # noqa: E402
+    INDEX_PATHS,
+    index_bytes,
+    make_queries,
+)
+from modules import vector_retriever  # noqa: E402
+from modules.faiss_index import flat_contents, recall_at_k, timed_search  # noqa: E402
+from modules.neo4j_vector_index import fetch_vector_index_state  # noqa: E402
+
+
+def _run_backend(search, queries, k):
+    """Per-query latencies (ms) and the returned ids, padded with -1 to k"""
+    found = np.full((len(queries), k), -1, dtype="int64")
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        # vector_retriever prints per query; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            hits = search(queries[i : i + 1])[0][0]
+        latencies[i] = (time.perf_counter() - start) * 1000
+        keys = [h["faiss_index"] for h in hits][:k]
+        found[i, : len(keys)] = keys
+    return found, latencies
+
+
+def run_benchmark(model_choice, flat, n_queries=100, k=5):
+    vectors, _ = flat_contents(flat)
+    queries = make_queries(vectors, n_queries)
+    truth, _ = timed_search(flat, queries, k)
+
+    if model_choice == "A":
+        index, mapping_path = vector_retriever.index_A, vector_retriever.MAPPING_A_PATH
+    else:
+        index, mapping_path = vector_retriever.index_B, vector_retriever.MAPPING_B_PATH
+
+    backends = {
+        # Unfiltered: both backends rank the whole corpus
+        "faiss": lambda q: vector_retriever._search_faiss(
+            model_choice, q, k, None, None, 0, [None] * len(q)
+        ),
+        "neo4j": lambda q: vector_retriever._search_neo4j(model_choice, q, k),
+    }
+    # FAISS: a private copy per app process; Neo4j: float32 vectors held once
+    # by the server (plus its HNSW graph), none in the app
+    memory = {
+        "faiss": {
+            "per_process_mb": (index_bytes(index) + os.path.getsize(mapping_path))
+            / 1e6,
+            "server_mb": 0.0,
+        },
+        "neo4j": {"per_process_mb": 0.0, "server_mb": vectors.nbytes / 1e6},
+    }
+
+    results = []
+    for name, search in backends.items():
+        found, ms = _run_backend(search, queries, k)
+        results.append(
+            {
+                "backend": name,
+                "recall": recall_at_k(found, truth),
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                **memory[name],
+            }
+        )
+    return results
+
+
+def print_table(results, k, workers):
+    print(
+        f"{'backend':8} {f'recall@{k}':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'MB/process':>10} {'MB server':>9} {f'MB x{workers}':>9}"
+    )
+    for r in results:
+        total = r["per_process_mb"] * workers + r["server_mb"]
+        print(
+            f"{r['backend']:8} {r['recall']:9.3f} {r['p50_ms']:8.2f} {r['p99_ms']:8.2f} "
+            f"{r['per_process_mb']:10.1f} {r['server_mb']:9.1f} {total:9.1f}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="FAISS vs Neo4j vector index for vector_search."
+    )
+    parser.add_argument("--model", choices=["A", "B"], default="A")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=4, help="App processes for the total column"
+    )
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    model_tag = f"model{args.model}"
+    with vector_retriever.driver.session() as session:
+        state = session.execute_read(fetch_vector_index_state, model_tag)
+    if not state or state[0] != "ONLINE":
+        raise SystemExit(
+            f"Neo4j vector index for {model_tag} is {state or 'missing'}; run "
+            "scripts/generate_embeddings.py --vector-index and wait for it to populate"
+        )
+
+    flat = faiss.read_index(INDEX_PATHS[args.model])
+    print(f"Model {args.model}: {flat.ntotal} vectors, dim {flat.d}\n")
+
+    results = run_benchmark(args.model, flat, n_queries=args.queries, k=args.k)
+    print_table(results, args.k, args.workers)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from pathlib import Path
 from config.settings import MODEL_OPTIONS, EMBEDDING_MODEL_OPTIONS
 from config.template_library import CYPHER_TEMPLATE_LIBRARY, local_intent_classify
 from modules.preprocessing import extract_entities
-from modules.cypher_retriever import retrieve_data_via_cypher
+from modules.cypher_retriever import retrieve_data
 from modules.vector_retriever import vector_search
 from modules.llm_helper import classify_with_deepseek, create_query_with_deepseek
 from modules.tests_llm_engine import (
@@ -57,7 +57,7 @@ def run_retrieval(mode, intents, entities, k, embedding_model=None):
     if mode == "Baseline (Cypher)":
         results = []
         for intent in intents:
-            res = retrieve_data_via_cypher(intent, entities, limit=k)
+            res = retrieve_data(intent, entities, limit=k)
             results.append(res)
         return results
 
@@ -66,7 +66,7 @@ def run_retrieval(mode, intents, entities, k, embedding_model=None):
 
     elif mode == "Hybrid":
         cypher_results = [
-            retrieve_data_via_cypher(intent, entities, limit=k) for intent in intents
+            retrieve_data(intent, entities, limit=k) for intent in intents
         ]
         vector_results = vector_search(entities, top_k=k, model_choice=embedding_model)
         return {"cypher": cypher_results, "vector": vector_results}
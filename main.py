@@ -294,9 +294,7 @@ if user_input:
             cypher_results = []
             for intent in intents:
                 try:
-                    ctx = cypher_retriever.retrieve_data_via_cypher(
-                        intent, entities, limit=k
-                    )
+                    ctx = cypher_retriever.retrieve_data(intent, entities, limit=k)
                     print(
                         f"\n\n####### Cypher retrieval result for {intent}: #######\n\n"
                     )
@@ -357,9 +355,7 @@ if user_input:
 
             for intent in intents:
                 try:
-                    c_res = cypher_retriever.retrieve_data_via_cypher(
-                        intent, entities, limit=k
-                    )
+                    c_res = cypher_retriever.retrieve_data(intent, entities, limit=k)
                     print(
                         f"\n\n####### Cypher retrieval result for {intent}: #######\n\n"
                     )
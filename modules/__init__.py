@@ -1,13 +1,10 @@
 # modules/__init__.py
 
-from . import (
-    db_manager,
-    preprocessing,
-    cypher_retriever,
-    vector_retriever,
-    graph_visualizer,
-)
+import importlib
 
+# Submodules are imported on first attribute access: vector_retriever loads
+# models and indexes at import, which build scripts that only need e.g.
+# modules.faiss_index must not pay for.
 __all__ = [
     "db_manager",
     "preprocessing",
@@ -15,3 +12,9 @@ __all__ = [
     "vector_retriever",
     "graph_visualizer",
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -48,28 +48,13 @@ def render_cypher_template(template: str, params: dict) -> str:
     return template
 
 
-# ---------------------------------------------------------
-# Main Retrieval Function
-# ---------------------------------------------------------
-
-
-def retrieve_data_via_cypher(intent: str, entities: Dict[str, Any], limit: int = 5):
+def build_params(intent: str, entities: Dict[str, Any], limit: int = 5):
     """
-    Entry point for Baseline Cypher Retrieval.
-
-    Args:
-        intent (str): Intent query from preprocessing
-        entities (dict): Extracted entities with fuzzy-matched values from preprocessing
-        limit (int): Limit count for query results
+    Convert extracted entities into template parameters.
 
-    Returns:
-        dict: Results + metadata + graph visualization data (safe for LLM)
-              Includes 'graph_nodes' and 'graph_edges' for visualization
+    Shared by every retrieval backend so Cypher and SQL templates see the
+    same values. Returns (params, missing required parameter names).
     """
-
-    # Pick the template for this intent
-    cypher = CYPHER_TEMPLATE_LIBRARY[intent]
-
     player1 = safe_get(entities, "players", 0)
     player2 = safe_get(entities, "players", 1)
 
@@ -104,6 +89,32 @@ def retrieve_data_via_cypher(intent: str, entities: Dict[str, Any], limit: int =
     if missing == ["season"]:
         params["season"] = "2022-23"
         missing = [p for p in required if p not in params]
+    return params, missing
+
+
+# ---------------------------------------------------------
+# Main Retrieval Function
+# ---------------------------------------------------------
+
+
+def retrieve_data_via_cypher(intent: str, entities: Dict[str, Any], limit: int = 5):
+    """
+    Entry point for Baseline Cypher Retrieval.
+
+    Args:
+        intent (str): Intent query from preprocessing
+        entities (dict): Extracted entities with fuzzy-matched values from preprocessing
+        limit (int): Limit count for query results
+
+    Returns:
+        dict: Results + metadata + graph visualization data (safe for LLM)
+              Includes 'graph_nodes' and 'graph_edges' for visualization
+    """
+
+    # Pick the template for this intent
+    cypher = CYPHER_TEMPLATE_LIBRARY[intent]
+
+    params, missing = build_params(intent, entities, limit)
     if missing:
         return {
             "intent": intent,
@@ -146,3 +157,22 @@ def retrieve_data_via_cypher(intent: str, entities: Dict[str, Any], limit: int =
         "graph_nodes": vis_nodes,
         "graph_edges": vis_edges,
     }
+
+
+def retrieve_data(intent: str, entities: Dict[str, Any], limit: int = 5):
+    """
+    Per-intent backend choice: aggregation intents with a SQL template run on
+    DuckDB when the facts store is available and has the requested
+    statistic, everything else on Neo4j. Both return the same result shape.
+    """
+    from modules import duckdb_retriever
+
+    if duckdb_retriever.supports(intent, entities):
+        try:
+            return duckdb_retriever.retrieve_data_via_duckdb(
+                intent, entities, limit=limit
+            )
+        except duckdb_retriever.duckdb.Error as e:
+            # Same answer from the graph, as for execute_query_with_graph failures
+            print(f"DuckDB query for {intent} failed ({e}); using Cypher instead")
+    return retrieve_data_via_cypher(intent, entities, limit=limit)
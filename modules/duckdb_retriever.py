@@ -0,0 +1,176 @@
+# modules/duckdb_retriever.py
+
+"""
+DuckDB Retriever Module
+-----------------------
+
+Analytical backend for the aggregation intents. Runs the SQL templates in
+config/sql_template_library.py against the embedded player_fixtures
+store built by scripts/create_facts_db.py.
+
+Leaderboards and per-player totals become columnar scans over one table
+instead of graph traversals. Results have the same shape as
+retrieve_data_via_cypher (the SQL is returned under 'cypher_query'), with
+no graph visualization data.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Any
+
+try:
+    import duckdb
+except ImportError:  # optional backend; intents fall back to Cypher
+    duckdb = None
+
+from config.settings import DUCKDB_PATH, ANALYTICS_BACKEND
+from config.sql_template_library import SQL_TEMPLATE_LIBRARY
+from modules.cypher_retriever import build_params, render_cypher_template, safe_get
+
+# Table written by scripts/create_facts_db.py
+FACTS_TABLE = "player_fixtures"
+
+_connection = None
+_connection_mtime = None
+_columns = frozenset()
+_active_cursors = 0
+_lock = threading.Lock()
+_warned_unavailable = False
+
+
+def _open_cursor():
+    """
+    Cursor on the read-only connection to the facts store. The connection
+    is opened on first use and reopened once the file has been replaced
+    (create_facts_db.py or a delta load) and no query is still running on it:
+    DuckDB reuses an open database for the same path, and closing the old
+    connection ends its cursors.
+    """
+    global _connection, _connection_mtime, _columns, _active_cursors
+    with _lock:
+        mtime = os.path.getmtime(DUCKDB_PATH)
+        replaced = _connection is not None and mtime != _connection_mtime
+        if _connection is None or (replaced and not _active_cursors):
+            if _connection is not None:
+                _connection.close()
+            _connection = duckdb.connect(DUCKDB_PATH, read_only=True)
+            _connection_mtime = mtime
+            _columns = frozenset(
+                row[0]
+                for row in _connection.execute(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_name = ?",
+                    [FACTS_TABLE],
+                ).fetchall()
+            )
+        _active_cursors += 1
+        return _connection.cursor()
+
+
+def _close_cursor(cursor):
+    global _active_cursors
+    cursor.close()
+    with _lock:
+        _active_cursors -= 1
+
+
+def _unavailable_reason():
+    if duckdb is None:
+        return "the duckdb package is not installed"
+    if not os.path.exists(DUCKDB_PATH):
+        return f"{DUCKDB_PATH} does not exist (run scripts/create_facts_db.py)"
+    return None
+
+
+def is_available() -> bool:
+    return _unavailable_reason() is None
+
+
+def fact_columns() -> frozenset:
+    """Column names of the facts table, read when the file is (re)opened"""
+    cursor = _open_cursor()
+    try:
+        return _columns
+    finally:
+        _close_cursor(cursor)
+
+
+def supports(intent: str, entities: Dict[str, Any] = None) -> bool:
+    """
+    True if this intent should be answered by DuckDB: it has a SQL template,
+    the facts store is available, and the requested statistic (for
+    templates that inject $stat_property) is a column of the facts table.
+    Stats the graph has but the table lacks (value, selected, transfers_*)
+    stay on Cypher.
+    """
+    global _warned_unavailable
+    if ANALYTICS_BACKEND != "duckdb" or intent not in SQL_TEMPLATE_LIBRARY:
+        return False
+    reason = _unavailable_reason()
+    if reason and not _warned_unavailable:
+        print(f"ANALYTICS_BACKEND=duckdb but {reason}; using Cypher instead")
+        _warned_unavailable = True
+    if reason:
+        return False
+    stat = safe_get(entities or {}, "statistics", 0)
+    if stat and "$stat_property" in SQL_TEMPLATE_LIBRARY[intent]:
+        return stat in fact_columns()
+    return True
+
+
+def execute_sql(sql: str, params: dict):
+    # DuckDB rejects named parameters the query does not use
+    used = set(re.findall(r"\$(\w+)", sql))
+    params = {k: v for k, v in params.items() if k in used}
+
+    # A cursor per query: the shared connection is not safe across threads
+    cursor = _open_cursor()
+    try:
+        result = cursor.execute(sql, params)
+        columns = [c[0] for c in result.description]
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+    finally:
+        _close_cursor(cursor)
+
+
+def retrieve_data_via_duckdb(intent: str, entities: Dict[str, Any], limit: int = 5):
+    """
+    Entry point for DuckDB Retrieval.
+
+    Args:
+        intent (str): Intent query from preprocessing
+        entities (dict): Extracted entities with fuzzy-matched values from preprocessing
+        limit (int): Limit count for query results
+
+    Returns:
+        dict: Same keys as retrieve_data_via_cypher; graph data is always empty
+    """
+    sql = SQL_TEMPLATE_LIBRARY[intent]
+
+    params, missing = build_params(intent, entities, limit)
+    if missing:
+        return {
+            "intent": intent,
+            "template_used": intent,
+            "cypher_query": sql,
+            "parameters": params,
+            "results": [],
+            "error": f"Missing required parameters for template: {missing}",
+            "graph_nodes": [],
+            "graph_edges": [],
+        }
+
+    sql = render_cypher_template(sql, params)
+    params.pop("stat_property", None)
+    params.pop("limit", None)
+
+    return {
+        "intent": intent,
+        "template_used": intent,
+        "cypher_query": sql,
+        "parameters": params,
+        "results": execute_sql(sql, params),
+        "graph_nodes": [],
+        "graph_edges": [],
+    }
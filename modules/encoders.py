@@ -0,0 +1,179 @@
+# modules/encoders.py
+
+"""
+Sentence Encoders
+-----------------
+
+Pluggable backends for the MiniLM / MPNet sentence-transformers models,
+chosen per model:
+
+    torch      SentenceTransformer (PyTorch), the default
+    onnx       the same transformer exported to ONNX, run with ONNX Runtime
+    onnx-int8  the ONNX export with int8 dynamic quantization (weights
+               stored as int8, activations quantized at run time)
+
+Every backend exposes the subset of the SentenceTransformer API the repo
+uses (encode, get_sentence_embedding_dimension), so callers swap them
+without changes. The ONNX backends apply the models' own pooling (mean
+over tokens, then L2 normalization) and do not load PyTorch at query time.
+
+ONNX exports are created on first use and cached under ONNX_CACHE_DIR.
+Exporting needs torch and transformers once; onnxruntime is optional and
+only required when an ONNX backend is selected.
+"""
+
+import inspect
+import json
+import os
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional backend; torch is used unless ONNX is selected
+    ort = None
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "./embeddings_out/onnx")
+
+
+def _export_dir(model_name: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def _max_seq_length(model_name: str, tokenizer) -> int:
+    """sentence-transformers truncation length (e.g. 256 for MiniLM, 384 for MPNet)"""
+    try:
+        from huggingface_hub import hf_hub_download
+
+        path = hf_hub_download(model_name, "sentence_bert_config.json")
+        with open(path) as f:
+            return json.load(f)["max_seq_length"]
+    except Exception:
+        return min(tokenizer.model_max_length, 512)
+
+
+def export_onnx(model_name: str, quantize: bool = False) -> str:
+    """
+    Export the model's transformer to ONNX (and optionally an int8 dynamic
+    quantized copy) into the cache. Returns the .onnx path; reuses earlier exports.
+    """
+    out_dir = _export_dir(model_name)
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        os.makedirs(out_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name).eval()
+        dummy = tokenizer(["export"], return_tensors="pt")
+        # torch >= 2.5 may default to the dynamo exporter (needs onnxscript);
+        # the TorchScript exporter handles these encoders on every version
+        legacy = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            legacy["dynamo"] = False
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dummy["input_ids"], dummy["attention_mask"]),
+                fp32_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=14,
+                **legacy,
+            )
+        tokenizer.save_pretrained(out_dir)
+        with open(os.path.join(out_dir, "max_seq_length.json"), "w") as f:
+            json.dump({"max_seq_length": _max_seq_length(model_name, tokenizer)}, f)
+
+    if not quantize:
+        return fp32_path
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer stand-in backed by an ONNX Runtime session."""
+
+    def __init__(self, model_name: str, quantize: bool = False, threads: int = 0):
+        if ort is None:
+            raise ImportError(
+                "onnxruntime is required for the onnx encoder backends "
+                "(pip install onnxruntime)"
+            )
+        from transformers import AutoTokenizer
+
+        path = export_onnx(model_name, quantize=quantize)
+        out_dir = os.path.dirname(path)
+        self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+        with open(os.path.join(out_dir, "max_seq_length.json")) as f:
+            self.max_seq_length = json.load(f)["max_seq_length"]
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            path, options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        self._dim = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self):
+        if not isinstance(self._dim, int):
+            self._dim = self.encode(["dimension"]).shape[1]
+        return self._dim
+
+    def encode(
+        self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False
+    ):
+        if isinstance(texts, str):
+            texts = [texts]
+        out = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                list(texts[start : start + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {
+                k: v.astype("int64") for k, v in batch.items() if k in self._inputs
+            }
+            hidden = self.session.run(None, feeds)[0]
+            # Mean pooling over real tokens, then L2 normalize (the models' own head)
+            mask = batch["attention_mask"][..., None].astype("float32")
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            out.append(pooled / np.maximum(norms, 1e-12))
+        if not out:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), "float32")
+        return np.concatenate(out).astype("float32")
+
+
+def load_encoder(model_name: str, backend: str = "torch", threads: int = 0):
+    """
+    Encoder for model_name on the given backend ("torch", "onnx", "onnx-int8").
+    threads: intra-op threads for ONNX Runtime (0 = its default).
+    """
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxSentenceEncoder(
+            model_name, quantize=backend == "onnx-int8", threads=threads
+        )
+    raise ValueError(f"backend must be one of {ENCODER_BACKENDS}, got {backend!r}")
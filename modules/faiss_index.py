@@ -0,0 +1,255 @@
+# modules/faiss_index.py
+
+"""
+FAISS Index Builders
+--------------------
+
+Builds the approximate and quantized index types served by vector_retriever
+from the exact IndexIDMap2(IndexFlatIP) written by
+scripts/generate_embeddings.py, the per-query search parameters for each
+type, and the codecs for vectors persisted outside FAISS.
+
+All indexes use inner product on normalized vectors (cosine similarity)
+and return the embedding_key ids of the flat index.
+
+Index types:
+    flat      exact scan over every vector
+    sq_fp16   exact scan over float16 vectors (half the memory)
+    sq8       exact scan over 8-bit scalar-quantized vectors (a quarter)
+    pq        exact scan over product-quantized codes (pq_m bytes per vector)
+    ivf_flat  inverted lists over k-means cells; search visits `nprobe` cells
+    ivf_pq    as ivf_flat, with vectors stored as product-quantized codes
+    hnsw      navigable small-world graph; search breadth is `ef_search`
+"""
+
+import math
+import time
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "sq_fp16", "sq8", "pq", "ivf_flat", "ivf_pq", "hnsw")
+
+# Storage formats for vectors persisted outside FAISS (Embedding nodes)
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Training sample cap for IVF coarse quantizers and PQ codebooks
+MAX_TRAIN_POINTS = 100_000
+
+
+def default_nlist(n: int) -> int:
+    """~4·sqrt(n) cells, the usual starting point for IVF"""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39 or 1))
+
+
+def flat_contents(index):
+    """(vectors, ids) stored in an IndexIDMap2 over a flat index"""
+    inner = faiss.downcast_index(index.index)
+    vectors = inner.reconstruct_n(0, index.ntotal)
+    ids = faiss.vector_to_array(index.id_map).astype("int64")
+    return vectors, ids
+
+
+def _train_sample(vectors, seed=0):
+    if len(vectors) <= MAX_TRAIN_POINTS:
+        return vectors
+    rng = np.random.default_rng(seed)
+    return vectors[rng.choice(len(vectors), MAX_TRAIN_POINTS, replace=False)]
+
+
+def _pq_m(dim, pq_m):
+    pq_m = pq_m or dim // 8
+    if dim % pq_m:
+        raise ValueError(f"pq_m={pq_m} must divide the dimension {dim}")
+    return pq_m
+
+
+def build_index(
+    index_type: str,
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    nlist: int = None,
+    pq_m: int = None,
+    pq_nbits: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+):
+    """
+    Build an index of `index_type` over normalized float32 vectors keyed by ids.
+
+    Args:
+        nlist (int): IVF cells (default ~4·sqrt(n))
+        pq_m (int): PQ sub-quantizers (pq, ivf_pq); must divide the dimension (default d/8)
+        pq_nbits (int): bits per PQ code
+        hnsw_m (int): HNSW graph degree
+        ef_construction (int): HNSW build-time search breadth
+    """
+    n, dim = vectors.shape
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if index_type == "flat":
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+    elif index_type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dim, hnsw_m, metric)
+        hnsw.hnsw.efConstruction = ef_construction
+        index = faiss.IndexIDMap2(hnsw)
+    elif index_type in ("sq_fp16", "sq8"):
+        qtype = (
+            faiss.ScalarQuantizer.QT_fp16
+            if index_type == "sq_fp16"
+            else faiss.ScalarQuantizer.QT_8bit
+        )
+        sq = faiss.IndexScalarQuantizer(dim, qtype, metric)
+        sq.train(_train_sample(vectors))
+        index = faiss.IndexIDMap2(sq)
+    elif index_type == "pq":
+        pq = faiss.IndexPQ(dim, _pq_m(dim, pq_m), pq_nbits, metric)
+        pq.train(_train_sample(vectors))
+        index = faiss.IndexIDMap2(pq)
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        nlist = nlist or default_nlist(n)
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, _pq_m(dim, pq_m), pq_nbits, metric
+            )
+        index.train(_train_sample(vectors))
+    else:
+        raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+
+    if n:
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def search_params(index, nprobe: int = None, ef_search: int = None, sel=None):
+    """
+    Per-query SearchParameters for `index`, or None for defaults.
+    Passed to index.search(..., params=...) so a shared index is never mutated.
+    sel: optional faiss.IDSelector restricting the search to its ids; the
+    index's own nprobe / efSearch are kept unless overridden.
+    """
+    inner = index
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(index.index)
+    if isinstance(inner, faiss.IndexIVF) and (nprobe or sel is not None):
+        return faiss.SearchParametersIVF(sel=sel, nprobe=int(nprobe or inner.nprobe))
+    if isinstance(inner, faiss.IndexHNSW) and (ef_search or sel is not None):
+        return faiss.SearchParametersHNSW(
+            sel=sel, efSearch=int(ef_search or inner.hnsw.efSearch)
+        )
+    if sel is not None:
+        return faiss.SearchParameters(sel=sel)
+    return None
+
+
+# Largest id subset search_subset scores directly from reconstructed
+# vectors. Above it a selector search is faster: on 50k x 384 flat vectors
+# direct scoring wins up to ~1k ids (0.03 vs 0.3 ms at 100) and loses
+# beyond ~2k (17 vs 5 ms at 25k).
+SUBSET_SCORE_MAX = 1024
+
+
+def subset_uses_selector(index, n_ids: int) -> bool:
+    """True when search_subset runs an IDSelector search for n_ids ids"""
+    inner = index
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(index.index)
+    # IVF cannot reconstruct by id, so it always searches with a selector;
+    # IndexPQ rejects search parameters, so it is always scored directly
+    if isinstance(inner, faiss.IndexIVF):
+        return True
+    return n_ids > SUBSET_SCORE_MAX and not isinstance(inner, faiss.IndexPQ)
+
+
+def search_subset(
+    index,
+    queries: np.ndarray,
+    ids,
+    k: int,
+    nprobe: int = None,
+    ef_search: int = None,
+    selector=None,
+):
+    """
+    Top-k of queries among the vectors stored under `ids` only, e.g. the
+    fixture rows of a few player-seasons. Returns (distances, ids) like
+    index.search, padded with -1 ids when fewer than k vectors qualify.
+
+    The search is restricted with an IDSelectorBatch over `ids` (or the
+    prebuilt `selector` for them) and runs with the caller's nprobe /
+    ef_search, like an unfiltered search. Subsets of at most
+    SUBSET_SCORE_MAX ids are scored directly from vectors reconstructed by
+    id instead, which every type but IVF supports (quantized types give
+    their approximate vectors), as are pq subsets of any size.
+    """
+    ids = np.asarray(ids, dtype="int64")
+    if subset_uses_selector(index, len(ids)):
+        if selector is None:
+            selector = faiss.IDSelectorBatch(ids)
+        params = search_params(index, nprobe, ef_search, sel=selector)
+        return index.search(queries, k, params=params)
+
+    ids = np.unique(ids)
+    distances = np.full((len(queries), k), -np.inf, dtype="float32")
+    labels = np.full((len(queries), k), -1, dtype="int64")
+    if len(ids):
+        scores = queries @ index.reconstruct_batch(ids).T
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        distances[:, : top.shape[1]] = np.take_along_axis(scores, top, axis=1)
+        labels[:, : top.shape[1]] = ids[top]
+    return distances, labels
+
+
+def timed_search(index, queries: np.ndarray, k: int, params=None):
+    """
+    Search one query at a time, as the app does.
+    Returns (ids of shape (nq, k), per-query latencies in ms).
+    """
+    ids = np.empty((len(queries), k), dtype="int64")
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, found = index.search(queries[i : i + 1], k, params=params)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        ids[i] = found[0]
+    return ids, latencies
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """Fraction of the exact top-k ids that the approximate search returned"""
+    k = truth.shape[1]
+    hits = sum(len(set(f[:k]) & set(t) - {-1}) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def encode_vectors(vectors: np.ndarray, dtype: str = "float32") -> list:
+    """
+    Per-row values for storing normalized vectors outside FAISS:
+    float lists for float32, packed bytes for float16 and int8.
+    int8 maps [-1, 1] to [-127, 127], which needs no per-vector scale
+    because the vectors are unit length.
+    """
+    if dtype == "float32":
+        return vectors.tolist()
+    if dtype == "float16":
+        return [row.tobytes() for row in vectors.astype("float16")]
+    if dtype == "int8":
+        codes = np.clip(np.rint(vectors * 127), -127, 127).astype("int8")
+        return [row.tobytes() for row in codes]
+    raise ValueError(f"dtype must be one of {VECTOR_DTYPES}, got {dtype!r}")
+
+
+def decode_vector(value, dtype: str = None) -> np.ndarray:
+    """Inverse of encode_vectors for one stored value (None dtype = float32 list)"""
+    if dtype in (None, "float32"):
+        return np.asarray(value, dtype="float32")
+    if dtype == "float16":
+        return np.frombuffer(bytes(value), dtype="float16").astype("float32")
+    if dtype == "int8":
+        vector = np.frombuffer(bytes(value), dtype="int8").astype("float32") / 127
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    raise ValueError(f"dtype must be one of {VECTOR_DTYPES}, got {dtype!r}")
@@ -16,10 +16,11 @@ SCHEMA = """
 
 - Season: [season_name]
 - Gameweek: [season, GW_number]
-- Fixture: [season, fixture_number], kickoff_time
+- Fixture: [season, fixture_number], GW_number, kickoff_time
 - Team: [name]
 - Player: [player_name, player_element]
 - Position: [name]
+- PlayerSeason: [player_name, player_element, season], matches_played, sum_<stat> for every PLAYED_IN stat
 
 ### Relationships:
 
@@ -28,12 +29,18 @@ SCHEMA = """
 - (Fixture) - [:HAS_HOME_TEAM]-> (Team)
 - (Fixture) - [:HAS_AWAY_TEAM]-> (Team)
 - (Player) - [:PLAYS_AS]-> (Position)
+- (Player) - [:PLAYS_FOR {season}]-> (Team)
 - (Player) - [:PLAYED_IN]-> (Fixture);
+- (Player) - [:HAS_SEASON_STATS]-> (PlayerSeason)
 
 #### Properties:
 
 minutes, goals_scored, assists, total_points, bonus, clean_sheets, goals_conceded, own_goals, penalties_saved, penalties_missed, yellow_cards, red_cards, saves, bps, influence, creativity, threat, ict_index, form
 
+PLAYED_IN also carries season, GW_number, kickoff_time, is_home (whether the player's team was the home side) and opponent (the other team's name), so season/gameweek filters can be written on the relationship itself, e.g. -[r:PLAYED_IN {season: $season, GW_number: $gw}]->, without going through Gameweek.
+
+Player nodes also carry career totals: matches_played and sum_<stat> for every property above (e.g. sum_total_points).
+
 """
 
 
@@ -0,0 +1,71 @@
+# modules/neo4j_vector_index.py
+
+"""
+Neo4j Vector Indexes
+--------------------
+
+Native Neo4j vector indexes over the `vector` property of Embedding nodes,
+the database-side alternative to the FAISS files (VECTOR_BACKEND=neo4j in
+vector_retriever).
+
+A vector index covers one label and property with a fixed dimension, and
+the two models (384 / 768 dims) share the Embedding label and `vector`
+property. Each model's nodes therefore also carry a model label, and each
+model gets its own index:
+
+    modelA  (:Embedding:EmbeddingA)  index embedding_vector_modelA
+    modelB  (:Embedding:EmbeddingB)  index embedding_vector_modelB
+
+Only float lists are indexed, so the nodes must be written with
+`--vector-store neo4j --vector-dtype float32` (the defaults).
+"""
+
+# Extra label per model tag; fixed names, safe to format into Cypher
+MODEL_LABELS = {"modelA": "EmbeddingA", "modelB": "EmbeddingB"}
+
+# Embedding nodes labelled per transaction by label_embedding_nodes
+LABEL_BATCH_SIZE = 500
+
+
+def vector_index_name(model_tag: str) -> str:
+    return f"embedding_vector_{model_tag}"
+
+
+def create_vector_index(tx, model_tag: str, dim: int):
+    """Cosine vector index over the model's Embedding nodes (no-op if present)."""
+    tx.run(
+        f"""
+        CREATE VECTOR INDEX {vector_index_name(model_tag)} IF NOT EXISTS
+        FOR (e:{MODEL_LABELS[model_tag]}) ON (e.vector)
+        OPTIONS {{indexConfig: {{
+            `vector.dimensions`: {int(dim)},
+            `vector.similarity_function`: 'cosine'
+        }}}}
+        """
+    )
+
+
+def label_embedding_nodes(tx, model_tag: str, limit: int = LABEL_BATCH_SIZE):
+    """Add the model label to one batch of nodes written without it."""
+    label = MODEL_LABELS[model_tag]
+    q = f"""
+    MATCH (e:Embedding {{model: $model}})
+    WHERE NOT e:{label}
+    WITH e LIMIT $limit
+    SET e:{label}
+    RETURN count(e) AS labelled
+    """
+    return tx.run(q, model=model_tag, limit=limit).single()["labelled"]
+
+
+def fetch_vector_index_state(tx, model_tag: str):
+    """(state, population %) of the model's vector index, or None if missing"""
+    record = tx.run(
+        """
+        SHOW INDEXES YIELD name, state, populationPercent
+        WHERE name = $name
+        RETURN state, populationPercent
+        """,
+        name=vector_index_name(model_tag),
+    ).single()
+    return (record["state"], record["populationPercent"]) if record else None
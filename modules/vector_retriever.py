@@ -1,15 +1,25 @@
 # modules/vector_retriever.py
 
 
+import functools
 import os
-import json
+import threading
+from collections import OrderedDict
 import numpy as np
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 import faiss
 import streamlit as st
+from modules.encoders import load_encoder
+from modules.faiss_index import search_params, search_subset, subset_uses_selector
 from modules.graph_visualizer import neo4j_to_visjs_graph
+from modules.neo4j_vector_index import vector_index_name
+from modules.vector_store import (
+    KeyGroups,
+    KeyMapping,
+    MetadataColumns,
+    season_index_paths,
+)
 
 # Load .env DO NOT REMOVE THIS because settings.py is not imported here
 load_dotenv()
@@ -25,6 +35,10 @@ NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 MODEL_A_NAME = os.getenv("MODEL_A_NAME")
 MODEL_B_NAME = os.getenv("MODEL_B_NAME")
 
+# Query encoder backend per model: torch, onnx or onnx-int8 (modules/encoders.py)
+ENCODER_BACKEND_A = os.getenv("ENCODER_BACKEND_A", "torch")
+ENCODER_BACKEND_B = os.getenv("ENCODER_BACKEND_B", "torch")
+
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "./embeddings_out")
 
 FAISS_INDEX_A_PATH = os.getenv("FAISS_INDEX_A_PATH")
@@ -33,6 +47,32 @@ FAISS_INDEX_B_PATH = os.getenv("FAISS_INDEX_B_PATH")
 MAPPING_A_PATH = os.getenv("MAPPING_A_PATH")
 MAPPING_B_PATH = os.getenv("MAPPING_B_PATH")
 
+# Search-time knobs for approximate indexes (ignored by flat indexes)
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "0")) or None
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "0")) or None
+
+# Two-stage search: player-seasons picked from the coarse index before the
+# fixture-level search (0 = search every fixture vector)
+TWO_STAGE_SEASONS = int(os.getenv("TWO_STAGE_SEASONS", "0"))
+
+# Where the vector search runs: "faiss" (indexes loaded into this process)
+# or "neo4j" (the database's vector indexes, see modules/neo4j_vector_index.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "faiss")
+
+# Normalized query vectors kept per (model choice, query text), LRU-evicted
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+
+# Filtered search: rank only rows whose player / season / position / GW
+# match the extracted entities (1 = on, 0 = search every row)
+METADATA_FILTER = os.getenv("METADATA_FILTER", "1") == "1"
+
+# Entity fields passed to MetadataColumns.select() (teams are not a column:
+# a fixture row has two)
+FILTER_FIELDS = ("players", "seasons", "positions", "gameweeks")
+
+# Selected key arrays kept per (model choice, filter values), LRU-evicted
+FILTER_CACHE_SIZE = 256
+
 
 @st.cache_resource(show_spinner=False)
 def get_driver():
@@ -50,14 +90,17 @@ driver = get_driver()
 @st.cache_resource(show_spinner=False)
 def get_models_and_indexes():
     print("Loading SentenceTransformer models and FAISS indexes into memory...")
-    model_A = SentenceTransformer(MODEL_A_NAME)
-    model_B = SentenceTransformer(MODEL_B_NAME)
+    model_A = load_encoder(MODEL_A_NAME, ENCODER_BACKEND_A)
+    model_B = load_encoder(MODEL_B_NAME, ENCODER_BACKEND_B)
+    if VECTOR_BACKEND == "neo4j":
+        # Searched in the database: no per-process copy of the indexes
+        print("VECTOR_BACKEND=neo4j: FAISS indexes not loaded.")
+        return model_A, model_B, None, None, None, None
     index_A = faiss.read_index(FAISS_INDEX_A_PATH)
     index_B = faiss.read_index(FAISS_INDEX_B_PATH)
-    with open(MAPPING_A_PATH, "r") as f:
-        mapping_A = json.load(f)
-    with open(MAPPING_B_PATH, "r") as f:
-        mapping_B = json.load(f)
+    # .npy key/node-id arrays (memory-mapped), or legacy .json dicts
+    mapping_A = KeyMapping.load(MAPPING_A_PATH)
+    mapping_B = KeyMapping.load(MAPPING_B_PATH)
     print("All embedding models and indexes loaded successfully.")
     return model_A, model_B, index_A, index_B, mapping_A, mapping_B
 
@@ -65,6 +108,41 @@ def get_models_and_indexes():
 model_A, model_B, index_A, index_B, mapping_A, mapping_B = get_models_and_indexes()
 
 
+@st.cache_resource(show_spinner=False)
+def get_season_indexes():
+    """Coarse player-season index and its fixture members per model, where built"""
+    season_indexes = {}
+    if VECTOR_BACKEND == "neo4j":
+        return season_indexes
+    for choice in ("A", "B"):
+        index_path, members_path = season_index_paths(OUTPUT_DIR, f"model{choice}")
+        if os.path.exists(index_path) and os.path.exists(members_path):
+            season_indexes[choice] = (
+                faiss.read_index(index_path),
+                KeyGroups.load(members_path),
+            )
+    return season_indexes
+
+
+season_indexes = get_season_indexes()
+
+
+@st.cache_resource(show_spinner=False)
+def get_metadata_columns():
+    """Per-row metadata columns of each model's index, where written"""
+    columns = {}
+    if VECTOR_BACKEND == "neo4j":
+        return columns
+    for choice in ("A", "B"):
+        metadata = MetadataColumns.open(OUTPUT_DIR, f"model{choice}")
+        if metadata is not None:
+            columns[choice] = metadata
+    return columns
+
+
+metadata_columns = get_metadata_columns()
+
+
 # =========================
 # HELPER FUNCTIONS
 # =========================
@@ -97,43 +175,168 @@ def _build_query_text(entities: dict) -> str:
     return " | ".join(parts)
 
 
-def _fetch_sources(tx, embedding_node_ids):
+class _QueryCache:
+    """
+    LRU of normalized query vectors keyed by (model choice, query text).
+    Unlike functools.lru_cache it can be read for a whole batch of texts, so
+    vector_search_batch encodes only the misses. Cached arrays are shared
+    between callers and therefore read-only.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._vectors.move_to_end(key)
+            return vector
+
+    def put(self, key, vector: np.ndarray):
+        vector.setflags(write=False)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.maxsize:
+                self._vectors.popitem(last=False)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "maxsize": self.maxsize,
+                "currsize": len(self._vectors),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+            self.hits = self.misses = 0
+
+
+_query_cache = _QueryCache(QUERY_CACHE_SIZE)
+
+
+def _encode_queries(model_choice: str, query_texts: list) -> dict:
+    # Many questions reduce to the same entity string ("Players: Mohamed Salah"),
+    # so the encoder only runs, in one batch, on the texts it has not seen
+    # recently. Returns {query text: (1, dim) read-only vector}.
+    vectors = {}
+    missing = []
+    for text in dict.fromkeys(query_texts):
+        vector = _query_cache.get((model_choice, text))
+        if vector is None:
+            missing.append(text)
+        else:
+            vectors[text] = vector
+    if missing:
+        model = model_A if model_choice == "A" else model_B
+        emb = model.encode(missing, convert_to_numpy=True)
+        emb_norm = (emb / np.linalg.norm(emb, axis=1, keepdims=True)).astype("float32")
+        for text, vector in zip(missing, emb_norm):
+            vector = vector[None, :]
+            _query_cache.put((model_choice, text), vector)
+            vectors[text] = vector
+    return vectors
+
+
+def _encode_query(model_choice: str, query_text: str) -> np.ndarray:
+    return _encode_queries(model_choice, [query_text])[query_text]
+
+
+def query_cache_info() -> dict:
+    """Hits, misses, maxsize and current size of the query embedding cache"""
+    return _query_cache.info()
+
+
+def clear_query_cache():
+    """Drop cached query vectors (e.g. after swapping an encoder)"""
+    _query_cache.clear()
+
+
+# Per-source fields of a hit, as returned in "sources"
+SOURCE_FIELDS = (
+    "embedding_id",
+    "model",
+    "text",
+    "source_node_id",
+    "source_label",
+    "player_name",
+)
+
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _filter_keys(model_choice: str, filters: tuple) -> np.ndarray:
+    # The selection scans the metadata columns once per distinct filter;
+    # repeat entity sets reuse the key array (read-only, shared)
+    keys = metadata_columns[model_choice].select(**dict(filters))
+    keys.setflags(write=False)
+    return keys
+
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _filter_selector(model_choice: str, filters: tuple):
+    # IDSelectorBatch over the same keys, for subsets search_subset does not
+    # score directly; building its hash set costs more than many searches
+    return faiss.IDSelectorBatch(_filter_keys(model_choice, filters))
+
+
+def _entity_filter(model_choice: str, entities: dict):
+    """
+    The normalized filter of the entities' players, seasons, positions and
+    gameweeks (the _filter_keys / _filter_selector cache key), or None to
+    search every row (filtering off, no metadata columns, no filterable
+    entities, or nothing matches).
+    """
+    if not METADATA_FILTER or model_choice not in metadata_columns:
+        return None
+    filters = tuple(
+        (field, tuple(sorted(entities[field])))
+        for field in FILTER_FIELDS
+        if entities.get(field)
+    )
+    if not filters:
+        return None
+    if not len(_filter_keys(model_choice, filters)):
+        print(f"No rows match {dict(filters)}; searching all rows")
+        return None
+    return filters
+
+
+def _fetch_hits(tx, embedding_keys):
+    # Source metadata and Player neighbourhood of each hit in one query,
+    # matched on embedding_key (unique constraint, so an index seek)
     q = """
-    UNWIND $embedding_ids AS eid
-    MATCH (e:Embedding) WHERE id(e) = eid
+    UNWIND $embedding_keys AS key
+    MATCH (e:Embedding {embedding_key: key})
     OPTIONAL MATCH (src)-[:HAS_EMBEDDING]->(e)
+    OPTIONAL MATCH (e)-[r]-(p:Player)
     RETURN
+        key AS embedding_key,
         id(e) AS embedding_id,
         e.model AS model,
         e.text AS text,
         id(src) AS source_node_id,
         e.source_label AS source_label,
-        src.player_name AS player_name
-    """
-    res = tx.run(q, embedding_ids=embedding_node_ids)
-    return [dict(r) for r in res]
-
-
-def _fetch_graph(tx, embedding_ids):
-    q = """
-    UNWIND $embedding_ids AS eid
-    MATCH (e:Embedding) WHERE id(e) = eid
-    MATCH (e)-[r]-(p:Player)
-    RETURN
-        collect(DISTINCT e) AS source_nodes,
-        collect(DISTINCT p) AS neighbor_nodes,
+        src.player_name AS player_name,
+        e AS node,
+        collect(DISTINCT p) AS neighbors,
         collect(DISTINCT r) AS edges
     """
-    res = tx.run(q, embedding_ids=embedding_ids).single()
-
-    if not res:
-        return [], []
+    res = tx.run(q, embedding_keys=embedding_keys)
+    return [dict(r) for r in res]
 
-    raw_nodes = [
-        n for n in (res["source_nodes"] + res["neighbor_nodes"]) if n is not None
-    ]
-    raw_edges = [e for e in res["edges"] if e is not None]
 
+def _graph_dicts(raw_nodes, raw_edges):
     # Convert Neo4j node objects to dictionaries
     nodes = []
     for node in raw_nodes:
@@ -158,71 +361,327 @@ def _fetch_graph(tx, embedding_ids):
     return nodes, edges
 
 
-# =========================
-# MAIN VECTOR SEARCH API
-# =========================
+def _fetch_vector_index(tx, index_name, vectors, k):
+    # Search, source lookup and neighbour expansion for every query vector
+    # in one query; qi is the row of the query vector
+    q = """
+    UNWIND range(0, size($vectors) - 1) AS qi
+    CALL {
+        WITH qi
+        CALL db.index.vector.queryNodes($index_name, $k, $vectors[qi])
+        YIELD node, score
+        RETURN node AS e, score
+    }
+    OPTIONAL MATCH (src)-[r:HAS_EMBEDDING]->(e)
+    RETURN
+        qi,
+        id(e) AS embedding_id,
+        e.embedding_key AS embedding_key,
+        score,
+        e.model AS model,
+        e.text AS text,
+        id(src) AS source_node_id,
+        e.source_label AS source_label,
+        src.player_name AS player_name,
+        e AS node,
+        src AS neighbor,
+        r AS edge
+    ORDER BY qi, score DESC
+    """
+    res = tx.run(q, index_name=index_name, k=k, vectors=vectors)
+    return list(res)
 
 
-def vector_search(entities: dict, top_k: int = 5, model_choice: str = "A") -> dict:
+def _faiss_hits(model_choice, queries, top_k, nprobe, ef_search, seasons, filters):
     """
-    model_choice: "A" or "B"
+    (hits, season_hits) per query row, from the in-process FAISS index.
+    filters: per row, the filter of the rows to rank (from _entity_filter),
+    or None to search every row (or two-stage, when enabled)
     """
+    index, mapping = (
+        (index_A, mapping_A) if model_choice == "A" else (index_B, mapping_B)
+    )
+    if index is None:
+        raise ValueError("FAISS indexes are not loaded (VECTOR_BACKEND=neo4j).")
+
+    seasons = TWO_STAGE_SEASONS if seasons is None else seasons
+    nprobe = nprobe or FAISS_NPROBE
+    ef_search = ef_search or FAISS_EF_SEARCH
+    season_hits = [[] for _ in queries]
+    distances = np.empty((len(queries), top_k), dtype="float32")
+    indices = np.empty((len(queries), top_k), dtype="int64")
+
+    # Filtered rows rank only their matching vectors; the filter already
+    # narrows the search, so two-stage applies to the others only
+    rest = []
+    for i, filter_key in enumerate(filters):
+        if filter_key is None:
+            rest.append(i)
+            continue
+        keys = _filter_keys(model_choice, filter_key)
+        selector = None
+        if subset_uses_selector(index, len(keys)):
+            selector = _filter_selector(model_choice, filter_key)
+        distances[i : i + 1], indices[i : i + 1] = search_subset(
+            index, queries[i : i + 1], keys, top_k, nprobe, ef_search, selector
+        )
 
-    model_choice = model_choice.upper()
+    if rest and seasons and model_choice not in season_indexes:
+        print(f"No player-season index for model {model_choice}; searching all rows")
+        seasons = 0
+
+    if rest and seasons:
+        # Coarse: best player-seasons; fine: only their fixture rows
+        season_index, members = season_indexes[model_choice]
+        season_dist, season_ids = season_index.search(queries[rest], seasons)
+        for row, i in enumerate(rest):
+            season_hits[i] = [
+                {"season_node_id": int(sid), "distance": float(dist)}
+                for dist, sid in zip(season_dist[row], season_ids[row])
+                if sid >= 0
+            ]
+            candidates = members.members([h["season_node_id"] for h in season_hits[i]])
+            distances[i : i + 1], indices[i : i + 1] = search_subset(
+                index, queries[i : i + 1], candidates, top_k, nprobe, ef_search
+            )
+    elif rest:
+        params = search_params(index, nprobe=nprobe, ef_search=ef_search)
+        distances[rest], indices[rest] = index.search(
+            queries[rest], top_k, params=params
+        )
 
-    if model_choice == "A":
-        model = model_A
-        index = index_A
-        mapping = mapping_A
-    elif model_choice == "B":
-        model = model_B
-        index = index_B
-        mapping = mapping_B
-    else:
-        raise ValueError("model_choice must be 'A' or 'B'.")
+    node_ids = mapping.lookup(indices)
+    results = []
+    for i in range(len(queries)):
+        hits = []
+        for dist, idx, emb_node_id in zip(distances[i], indices[i], node_ids[i]):
+            if idx < 0 or emb_node_id < 0:
+                continue
+            hits.append(
+                {
+                    "faiss_index": int(idx),
+                    "distance": float(dist),
+                    "embedding_node_id": int(emb_node_id),
+                }
+            )
+        results.append((hits, season_hits[i]))
+    return results
+
+
+def _resolve_hits(hits_per_query):
+    """
+    Sources and Player neighbourhood of the hits of each query: one
+    _fetch_hits round trip for all queries' hits, split back per query.
+    """
+    keys_per_query = [
+        list(dict.fromkeys(h["faiss_index"] for h in hits)) for hits in hits_per_query
+    ]
+    all_keys = list(dict.fromkeys(key for keys in keys_per_query for key in keys))
 
-    # -------- 1. Build query text --------
-    query_text = _build_query_text(entities)
-    if not query_text:
-        query_text = "General football query"
-    print(f"Embedding using model {model_choice}: {query_text}")
+    with driver.session() as session:
+        rows = session.read_transaction(_fetch_hits, all_keys)
+
+    rows_by_key = {}
+    for row in rows:
+        rows_by_key.setdefault(row["embedding_key"], []).append(row)
+
+    resolved = []
+    for embedding_keys in keys_per_query:
+        print("Number of embedding_ids:", len(embedding_keys))
+        sources, raw_nodes, neighbors, edges = [], {}, {}, {}
+        for row in (row for key in embedding_keys for row in rows_by_key.get(key, [])):
+            sources.append({field: row[field] for field in SOURCE_FIELDS})
+            if row["neighbors"]:
+                raw_nodes[row["node"].element_id] = row["node"]
+            for node in row["neighbors"]:
+                neighbors.setdefault(node.element_id, node)
+            for rel in row["edges"]:
+                edges.setdefault(rel.element_id, rel)
+        raw_nodes = list(raw_nodes.values()) + list(neighbors.values())
+        resolved.append((sources, *_graph_dicts(raw_nodes, list(edges.values()))))
+    return resolved
+
+
+def _search_faiss(model_choice, queries, top_k, nprobe, ef_search, seasons, filters):
+    """FAISS search in this process, then one Neo4j read to resolve the hits"""
+    found = _faiss_hits(
+        model_choice, queries, top_k, nprobe, ef_search, seasons, filters
+    )
+    resolved = _resolve_hits([hits for hits, _ in found])
+    return [
+        (hits, season_hits, sources, nodes, edges)
+        for (hits, season_hits), (sources, nodes, edges) in zip(found, resolved)
+    ]
 
-    # -------- 2. Encode --------
-    emb = model.encode([query_text], convert_to_numpy=True)
-    emb_norm = emb / np.linalg.norm(emb, axis=1, keepdims=True)
 
-    # -------- 3. Vector similarity search --------
-    distances, indices = index.search(emb_norm.astype("float32"), top_k)
+def _search_neo4j(model_choice, queries, top_k):
+    """Neo4j vector index search, resolved in the same query"""
+    with driver.session() as session:
+        records = session.execute_read(
+            _fetch_vector_index,
+            vector_index_name(f"model{model_choice}"),
+            queries.tolist(),
+            top_k,
+        )
 
-    hits = []
-    for dist, idx in zip(distances[0], indices[0]):
-        if idx < 0:
-            continue
-        emb_node_id = mapping.get(str(int(idx)))
+    per_query = [([], [], {}, {}) for _ in queries]
+    for r in records:
+        hits, sources, raw_nodes, raw_edges = per_query[r["qi"]]
         hits.append(
             {
-                "faiss_index": int(idx),
-                "distance": float(dist),
-                "embedding_node_id": int(emb_node_id),
+                # same id as the FAISS path; Neo4j's cosine score is (1 + cos) / 2
+                "faiss_index": r["embedding_key"],
+                "distance": 2 * r["score"] - 1,
+                "embedding_node_id": r["embedding_id"],
             }
         )
+        sources.append({field: r[field] for field in SOURCE_FIELDS})
+        for node in (r["node"], r["neighbor"]):
+            if node is not None:
+                raw_nodes[node.element_id] = node
+        if r["edge"] is not None:
+            raw_edges[r["edge"].element_id] = r["edge"]
+
+    results = []
+    for hits, sources, raw_nodes, raw_edges in per_query:
+        print("Number of embedding_ids:", len(hits))
+        nodes, edges = _graph_dicts(list(raw_nodes.values()), list(raw_edges.values()))
+        results.append((hits, [], sources, nodes, edges))
+    return results
+
+
+def _check_choices(model_choice, backend):
+    model_choice = model_choice.upper()
+    if model_choice not in ("A", "B"):
+        raise ValueError("model_choice must be 'A' or 'B'.")
+    backend = backend or VECTOR_BACKEND
+    if backend not in ("faiss", "neo4j"):
+        raise ValueError("backend must be 'faiss' or 'neo4j'.")
+    return model_choice, backend
 
-    embedding_ids = list({h["embedding_node_id"] for h in hits})
 
-    with driver.session() as session:
-        sources = session.read_transaction(_fetch_sources, embedding_ids)
+def _query_text(entities: dict) -> str:
+    query_text = _build_query_text(entities)
+    if not query_text:
+        query_text = "General football query"
+    return query_text
 
-        print("Number of embedding_ids:", len(embedding_ids))
 
-        neo4j_nodes, neo4j_edges = session.read_transaction(_fetch_graph, embedding_ids)
+def _search(
+    model_choice, backend, entities_list, queries, top_k, nprobe, ef_search, seasons
+):
+    if backend == "neo4j":
+        return _search_neo4j(model_choice, queries, top_k), [None] * len(queries)
+    filters = [_entity_filter(model_choice, entities) for entities in entities_list]
+    found = _search_faiss(
+        model_choice, queries, top_k, nprobe, ef_search, seasons, filters
+    )
+    keys = [None if f is None else _filter_keys(model_choice, f) for f in filters]
+    return found, keys
 
-    vis_nodes, vis_edges = neo4j_to_visjs_graph(neo4j_nodes, neo4j_edges)
 
+def _result(query_text, model_choice, backend, found, keys):
+    hits, season_hits, sources, neo4j_nodes, neo4j_edges = found
+    vis_nodes, vis_edges = neo4j_to_visjs_graph(neo4j_nodes, neo4j_edges)
     return {
         "query_text": query_text,
         "model_used": model_choice,
+        "backend": backend,
         "hits": hits,
+        "season_hits": season_hits,
+        # rows the metadata filter left to rank, None when unfiltered
+        "filter_rows": None if keys is None else len(keys),
         "sources": sources,
         "graph_nodes": vis_nodes,
         "graph_edges": vis_edges,
     }
+
+
+# =========================
+# MAIN VECTOR SEARCH API
+# =========================
+
+
+def vector_search(
+    entities: dict,
+    top_k: int = 5,
+    model_choice: str = "A",
+    nprobe: int = None,
+    ef_search: int = None,
+    seasons: int = None,
+    backend: str = None,
+) -> dict:
+    """
+    model_choice: "A" or "B"
+    nprobe: IVF cells to visit (IVF indexes; default FAISS_NPROBE)
+    ef_search: HNSW search breadth (HNSW indexes; default FAISS_EF_SEARCH)
+    seasons: two-stage mode; search the player-season index first, then only
+        the fixture vectors of the top `seasons` player-seasons
+        (default TWO_STAGE_SEASONS; 0 = one search over every fixture vector)
+    backend: "faiss" or "neo4j" (default VECTOR_BACKEND); the neo4j backend
+        ignores nprobe, ef_search and seasons
+    With METADATA_FILTER on, the FAISS backend ranks only the rows whose
+    player, season, position and gameweek match the entities (two-stage
+    mode is then skipped), and searches every row when nothing matches.
+    """
+
+    model_choice, backend = _check_choices(model_choice, backend)
+
+    # -------- 1. Build query text --------
+    query_text = _query_text(entities)
+    print(f"Embedding using model {model_choice}: {query_text}")
+
+    # -------- 2. Encode (cached per model and query text) --------
+    query = _encode_query(model_choice, query_text)
+
+    # -------- 3. Vector similarity search + 4. Neo4j lookup --------
+    found, filters = _search(
+        model_choice, backend, [entities], query, top_k, nprobe, ef_search, seasons
+    )
+    return _result(query_text, model_choice, backend, found[0], filters[0])
+
+
+def vector_search_batch(
+    entities_list: list,
+    top_k: int = 5,
+    model_choice: str = "A",
+    nprobe: int = None,
+    ef_search: int = None,
+    seasons: int = None,
+    backend: str = None,
+) -> list:
+    """
+    vector_search over many entity dicts at once, for offline scoring.
+    Query texts missing from the query cache are encoded in one batch
+    (and cached, as vector_search would), searched as one stacked matrix
+    (one Neo4j query for the neo4j backend), and every hit is resolved in the
+    same UNWIND round trips. Returns one result per entity dict, as
+    vector_search would. Options are the same as vector_search's.
+    """
+    model_choice, backend = _check_choices(model_choice, backend)
+    if not entities_list:
+        return []
+
+    # -------- 1. Build query texts --------
+    query_texts = [_query_text(entities) for entities in entities_list]
+    print(f"Embedding {len(query_texts)} queries using model {model_choice}")
+
+    # -------- 2. Encode the uncached distinct texts in one batch --------
+    vectors = _encode_queries(model_choice, query_texts)
+    queries = np.vstack([vectors[text] for text in query_texts])
+
+    # -------- 3. Vector similarity search + 4. Neo4j lookup --------
+    found, filters = _search(
+        model_choice,
+        backend,
+        entities_list,
+        queries,
+        top_k,
+        nprobe,
+        ef_search,
+        seasons,
+    )
+    return [
+        _result(query_text, model_choice, backend, result, keys)
+        for query_text, result, keys in zip(query_texts, found, filters)
+    ]
@@ -0,0 +1,341 @@
+# modules/vector_store.py
+
+"""
+Sidecar Vector Store
+--------------------
+
+Raw embedding vectors kept next to the FAISS index in embeddings_out/
+instead of as properties on Embedding nodes:
+
+    vectors_<model>.npy       (n, d) float32 / float16 / int8 rows
+    vector_keys_<model>.npy   (n,) int64 embedding_key of each row
+
+the FAISS id -> Embedding node id mappings:
+
+    idx_to_embedding_id_<model>.npy   (n, 2) int64 [embedding_key, node id],
+                                      sorted by embedding_key
+
+the coarse player-season index used by two-stage search, with the fixture
+rows (embedding keys) of each player-season:
+
+    faiss_index_<model>_seasons.index   flat index keyed by PlayerSeason node id
+    season_members_<model>.npy          (n, 2) int64 [PlayerSeason node id,
+                                        embedding_key], sorted by node id
+
+and the per-row metadata columns used by filtered search:
+
+    metadata_<model>.npy    (n, 6) int64 [embedding_key, player, player_element,
+                            season, position, GW], sorted by embedding_key
+    metadata_<model>.json   names behind the player / season / position codes
+
+The .npy files are plain arrays opened with mmap_mode="r", so reading them
+costs page cache for the rows touched rather than a full load, and
+rebuilding an index from them is a local file operation.
+"""
+
+import json
+import os
+
+import faiss
+import numpy as np
+
+from modules.faiss_index import VECTOR_DTYPES
+
+# Columns of metadata_<model>.npy; player, season and position are codes
+# into the sorted names of metadata_<model>.json, missing values are -1
+METADATA_COLUMNS = (
+    "embedding_key",
+    "player",
+    "player_element",
+    "season",
+    "position",
+    "GW",
+)
+CODED_COLUMNS = ("player", "season", "position")
+
+# MetadataColumns.select() filter -> column
+FILTER_COLUMNS = {
+    "players": "player",
+    "player_elements": "player_element",
+    "seasons": "season",
+    "positions": "position",
+    "gameweeks": "GW",
+}
+
+# Rows copied out of the FAISS index per write
+WRITE_CHUNK_ROWS = 50_000
+
+
+def sidecar_paths(output_dir: str, model_tag: str):
+    return (
+        os.path.join(output_dir, f"vectors_{model_tag}.npy"),
+        os.path.join(output_dir, f"vector_keys_{model_tag}.npy"),
+    )
+
+
+def _to_dtype(vectors, dtype):
+    if dtype == "int8":
+        # Unit vectors: fixed [-1, 1] -> [-127, 127] scale, as on Embedding nodes
+        return np.clip(np.rint(vectors * 127), -127, 127).astype("int8")
+    return vectors.astype(dtype)
+
+
+def write_sidecar(index, output_dir: str, model_tag: str, dtype: str = "float32"):
+    """
+    Write the vectors and ids of an IndexIDMap2 over a flat index to the
+    sidecar files, copying `WRITE_CHUNK_ROWS` rows at a time. Files are
+    written next to the old ones and swapped in, so readers holding the
+    old memmap are unaffected.
+    """
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"dtype must be one of {VECTOR_DTYPES}, got {dtype!r}")
+    vectors_path, keys_path = sidecar_paths(output_dir, model_tag)
+    inner = faiss.downcast_index(index.index)
+
+    tmp_vectors = vectors_path + ".tmp.npy"
+    out = np.lib.format.open_memmap(
+        tmp_vectors, mode="w+", dtype=dtype, shape=(index.ntotal, index.d)
+    )
+    for start in range(0, index.ntotal, WRITE_CHUNK_ROWS):
+        n = min(WRITE_CHUNK_ROWS, index.ntotal - start)
+        out[start : start + n] = _to_dtype(inner.reconstruct_n(start, n), dtype)
+    out.flush()
+    del out
+
+    tmp_keys = keys_path + ".tmp.npy"
+    np.save(tmp_keys, faiss.vector_to_array(index.id_map).astype("int64"))
+
+    os.replace(tmp_vectors, vectors_path)
+    os.replace(tmp_keys, keys_path)
+    return vectors_path
+
+
+class SidecarVectors:
+    """Read-only, memory-mapped view of one model's sidecar files."""
+
+    def __init__(self, output_dir: str, model_tag: str):
+        vectors_path, keys_path = sidecar_paths(output_dir, model_tag)
+        self.vectors = np.load(vectors_path, mmap_mode="r")
+        keys = np.load(keys_path)
+        # Sorted keys for O(log n) lookup without a Python dict per row
+        self._order = np.argsort(keys)
+        self._sorted_keys = keys[self._order]
+
+    @classmethod
+    def open(cls, output_dir: str, model_tag: str):
+        """The sidecar, or None if it has not been written yet."""
+        if not all(os.path.exists(p) for p in sidecar_paths(output_dir, model_tag)):
+            return None
+        return cls(output_dir, model_tag)
+
+    def __len__(self):
+        return len(self._sorted_keys)
+
+    def rows(self, keys) -> np.ndarray:
+        """Row number of each key, -1 where the key is not stored."""
+        keys = np.asarray(keys, dtype="int64")
+        if not len(self._sorted_keys):
+            return np.full(keys.shape, -1, dtype="int64")
+        pos = np.searchsorted(self._sorted_keys, keys)
+        pos = np.minimum(pos, len(self._sorted_keys) - 1)
+        return np.where(self._sorted_keys[pos] == keys, self._order[pos], -1)
+
+    def get(self, keys) -> np.ndarray:
+        """float32 unit vectors for keys, which must all be stored."""
+        rows = self.rows(keys)
+        if (rows < 0).any():
+            raise KeyError(f"{int((rows < 0).sum())} keys missing from sidecar")
+        vectors = np.asarray(self.vectors[np.sort(rows)], dtype="float32")
+        # fancy indexing on sorted rows reads the memmap sequentially
+        vectors = vectors[np.argsort(np.argsort(rows))]
+        if self.vectors.dtype == np.int8:
+            faiss.normalize_L2(vectors)
+        return vectors
+
+
+def write_mapping(path: str, mapping: dict):
+    """Save {embedding_key: node id} as a key-sorted (n, 2) int64 array."""
+    pairs = np.array(list(mapping.items()), dtype="int64").reshape(-1, 2)
+    pairs = pairs[np.argsort(pairs[:, 0], kind="stable")]
+    tmp = path + ".tmp.npy"
+    np.save(tmp, pairs)
+    os.replace(tmp, path)
+
+
+class KeyMapping:
+    """
+    FAISS id (embedding_key) -> Embedding node id, backed by a key-sorted
+    int64 array instead of a dict of strings. The .npy form is memory-mapped,
+    so load time and memory scale with the file, not with Python objects.
+    Keys are 63-bit hashes rather than positions, so lookup is a binary
+    search over the sorted keys.
+    """
+
+    def __init__(self, pairs: np.ndarray):
+        self._keys = pairs[:, 0]
+        self._values = pairs[:, 1]
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Load a mapping from .npy. Falls back to the legacy JSON dict
+        (converted once at load) when only a .json file exists.
+        """
+        root, ext = os.path.splitext(path)
+        npy_path, json_path = root + ".npy", root + ".json"
+        if os.path.exists(npy_path):
+            return cls(np.load(npy_path, mmap_mode="r"))
+        with open(json_path, "r") as f:
+            legacy = json.load(f)
+        pairs = np.array(
+            [(int(k), int(v)) for k, v in legacy.items()], dtype="int64"
+        ).reshape(-1, 2)
+        return cls(pairs[np.argsort(pairs[:, 0], kind="stable")])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, keys) -> np.ndarray:
+        """Node id per key, -1 where the key is not mapped."""
+        keys = np.asarray(keys, dtype="int64")
+        if not len(self._keys):
+            return np.full(keys.shape, -1, dtype="int64")
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[pos] == keys, self._values[pos], -1)
+
+    def get(self, key, default=None):
+        value = int(self.lookup([key])[0])
+        return default if value < 0 else value
+
+
+def season_index_paths(output_dir: str, model_tag: str):
+    return (
+        os.path.join(output_dir, f"faiss_index_{model_tag}_seasons.index"),
+        os.path.join(output_dir, f"season_members_{model_tag}.npy"),
+    )
+
+
+def write_groups(path: str, pairs):
+    """Save [group id, member key] pairs as a group-sorted (n, 2) int64 array."""
+    pairs = np.asarray(pairs, dtype="int64").reshape(-1, 2)
+    pairs = pairs[np.argsort(pairs[:, 0], kind="stable")]
+    tmp = path + ".tmp.npy"
+    np.save(tmp, pairs)
+    os.replace(tmp, path)
+
+
+class KeyGroups:
+    """
+    Group id -> member keys (e.g. PlayerSeason node id -> embedding keys of
+    its fixture rows), backed by a group-sorted int64 array. Each group is
+    a contiguous run found with two binary searches.
+    """
+
+    def __init__(self, pairs: np.ndarray):
+        self._groups = pairs[:, 0]
+        self._members = pairs[:, 1]
+
+    @classmethod
+    def load(cls, path: str):
+        return cls(np.load(path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self._groups)
+
+    def members(self, groups) -> np.ndarray:
+        """Member keys of all the given groups, concatenated"""
+        groups = np.asarray(groups, dtype="int64")
+        starts = np.searchsorted(self._groups, groups, side="left")
+        ends = np.searchsorted(self._groups, groups, side="right")
+        runs = [self._members[a:b] for a, b in zip(starts, ends)]
+        return np.concatenate(runs) if runs else np.zeros(0, dtype="int64")
+
+
+def metadata_paths(output_dir: str, model_tag: str):
+    return (
+        os.path.join(output_dir, f"metadata_{model_tag}.npy"),
+        os.path.join(output_dir, f"metadata_{model_tag}.json"),
+    )
+
+
+def write_metadata(output_dir: str, model_tag: str, records):
+    """
+    Save (embedding_key, player_name, player_element, season, position, GW)
+    records as the metadata columns of one model's index.
+    """
+    records = list(records)
+    vocab = {
+        column: sorted({r[i] for r in records if r[i] not in (None, "")})
+        for i, column in enumerate(METADATA_COLUMNS)
+        if column in CODED_COLUMNS
+    }
+    codes = {column: {v: c for c, v in enumerate(vocab[column])} for column in vocab}
+
+    columns = np.full((len(records), len(METADATA_COLUMNS)), -1, dtype="int64")
+    for row, record in zip(columns, records):
+        for i, (column, value) in enumerate(zip(METADATA_COLUMNS, record)):
+            if column in codes:
+                row[i] = codes[column].get(value, -1)
+            elif value is not None:
+                row[i] = int(value)
+    columns = columns[np.argsort(columns[:, 0], kind="stable")]
+
+    columns_path, vocab_path = metadata_paths(output_dir, model_tag)
+    np.save(columns_path + ".tmp.npy", columns)
+    with open(vocab_path + ".tmp", "w") as f:
+        json.dump(vocab, f)
+    os.replace(columns_path + ".tmp.npy", columns_path)
+    os.replace(vocab_path + ".tmp", vocab_path)
+    return columns_path
+
+
+class MetadataColumns:
+    """
+    Per-row metadata of one model's index (player, season, position, GW),
+    memory-mapped. select() turns entity values into the embedding keys of
+    the matching rows, for search_subset.
+    """
+
+    def __init__(self, columns: np.ndarray, vocab: dict):
+        self.columns = columns
+        self._codes = {
+            column: {v: c for c, v in enumerate(names)}
+            for column, names in vocab.items()
+        }
+
+    @classmethod
+    def open(cls, output_dir: str, model_tag: str):
+        """The metadata columns, or None if they have not been written yet."""
+        columns_path, vocab_path = metadata_paths(output_dir, model_tag)
+        if not (os.path.exists(columns_path) and os.path.exists(vocab_path)):
+            return None
+        with open(vocab_path) as f:
+            vocab = json.load(f)
+        return cls(np.load(columns_path, mmap_mode="r"), vocab)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def select(self, **filters) -> np.ndarray:
+        """
+        Embedding keys of the rows matching every non-empty filter, e.g.
+        select(players=["Mohamed Salah"], seasons=["2022-23"]). Filters are
+        lists of accepted values for: players, player_elements, seasons,
+        positions, gameweeks. Unknown names match nothing.
+        """
+        mask = np.ones(len(self.columns), dtype=bool)
+        for name, values in filters.items():
+            if name not in FILTER_COLUMNS:
+                raise ValueError(
+                    f"unknown filter {name!r}, expected one of {list(FILTER_COLUMNS)}"
+                )
+            if not values:
+                continue
+            column = FILTER_COLUMNS[name]
+            if column in self._codes:
+                values = [
+                    self._codes[column][v] for v in values if v in self._codes[column]
+                ]
+            index = METADATA_COLUMNS.index(column)
+            mask &= np.isin(self.columns[:, index], np.asarray(values, dtype="int64"))
+        return np.asarray(self.columns[mask, 0])
@@ -0,0 +1,96 @@
+# scripts/create_facts_db.py
+
+import argparse
+import os
+import time
+import duckdb
+import pandas as pd
+
+from create_kg import CSV_PATH, PLAYED_IN_PROPS, cast_types, with_home_flags
+
+# Relative to scripts/, like config.txt; the app reads DUCKDB_PATH from .env
+DUCKDB_PATH = "../data/fpl_facts.duckdb"
+
+FACTS_TABLE = "player_fixtures"
+
+# Same identity and context as a PLAYED_IN relationship, plus the columns the
+# graph keeps on neighbouring nodes (position, home/away team, PLAYS_FOR team)
+FACT_COLUMNS = [
+    "player_name",
+    "player_element",
+    "season",
+    "GW",
+    "fixture",
+    "kickoff_time",
+    "position",
+    "home_team",
+    "away_team",
+    "is_home",
+    "team",
+    "opponent",
+] + PLAYED_IN_PROPS
+
+
+def fact_frame(df):
+    """One row per player per fixture, deduplicated the way MERGE would."""
+    facts = df.rename(columns={"name": "player_name", "element": "player_element"})
+    facts = facts.drop_duplicates(
+        ["player_name", "player_element", "season", "fixture"], keep="last"
+    )
+    return facts[FACT_COLUMNS].reset_index(drop=True)
+
+
+def write_facts(facts, path, parquet_path=None):
+    """
+    Build the table in a new file and swap it in, so a running app keeps
+    reading the old file until it reopens the new one.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = duckdb.connect(tmp)
+    con.register("facts", facts)
+    # Sorted by player so name lookups touch few row groups
+    con.execute(
+        f"CREATE OR REPLACE TABLE {FACTS_TABLE} AS "
+        "SELECT * FROM facts ORDER BY player_name, season, fixture"
+    )
+    con.unregister("facts")
+    if parquet_path:
+        con.execute(f"COPY {FACTS_TABLE} TO '{parquet_path}' (FORMAT PARQUET)")
+    count = con.execute(f"SELECT count(*) FROM {FACTS_TABLE}").fetchone()[0]
+    con.close()
+    os.replace(tmp, path)
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build the DuckDB player-fixture facts store for the SQL backend."
+    )
+    parser.add_argument("--csv", default=CSV_PATH, help="Input CSV path")
+    parser.add_argument(
+        "--out",
+        default=DUCKDB_PATH,
+        help=f"DuckDB database file (default {DUCKDB_PATH})",
+    )
+    parser.add_argument(
+        "--parquet", default=None, help="Also export the table to this Parquet file"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("Loading CSV data...")
+    start = time.perf_counter()
+    df = with_home_flags(cast_types(pd.read_csv(args.csv)))
+    count = write_facts(fact_frame(df), args.out, args.parquet)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} rows to {args.out}:{FACTS_TABLE} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,69 @@
 # scripts/create_kg.py
 
+import argparse
+import hashlib
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError
+
+CSV_PATH = "fpl_two_seasons.csv"
+
+# Rows per UNWIND statement in batch mode
+BATCH_SIZE = 5000
+
+# Attempts per batch when the server reports a transient error (e.g. deadlock)
+MAX_RETRIES = 5
+
+# Output directory for neo4j-admin import CSVs in import mode
+IMPORT_DIR = "import"
+
+# PLAYED_IN relationship properties and the types they are stored as
+PLAYED_IN_INT_PROPS = [
+    "minutes",
+    "goals_scored",
+    "assists",
+    "total_points",
+    "bonus",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bps",
+]
+PLAYED_IN_FLOAT_PROPS = ["influence", "creativity", "threat", "ict_index", "form"]
+PLAYED_IN_PROPS = PLAYED_IN_INT_PROPS + PLAYED_IN_FLOAT_PROPS
+
+# CSV columns player_teams reads; batch mode's first pass reads only these
+TEAM_KEY_COLUMNS = [
+    "name",
+    "element",
+    "season",
+    "fixture",
+    "kickoff_time",
+    "home_team",
+    "away_team",
+]
+
+# Fixtures either side of a row that player_teams looks at
+TEAM_WINDOW = 3
+
+# Undecided player-fixtures printed individually by player_teams
+AMBIGUOUS_REPORT_LIMIT = 20
+
+# Stats materialized as sum_<stat> on Player (career) and PlayerSeason nodes.
+# These are the STAT_VARIANTS stats stored on PLAYED_IN; price, ownership and
+# transfer stats never make it into the graph, so there is nothing to total.
+AGGREGATE_STATS = PLAYED_IN_PROPS
 
 
 def read_config(file_path="config.txt"):
@@ -32,6 +94,38 @@ def create_constraints(tx):
     tx.run(
         "CREATE CONSTRAINT IF NOT EXISTS FOR (pos:Position) REQUIRE pos.name IS UNIQUE"
     )
+    tx.run(
+        "CREATE CONSTRAINT IF NOT EXISTS FOR (ps:PlayerSeason) REQUIRE (ps.player_name, ps.player_element, ps.season) IS UNIQUE"
+    )
+
+
+def create_indexes(tx):
+    # Denormalized PLAYED_IN / Fixture properties that templates filter on directly
+    tx.run(
+        "CREATE INDEX played_in_season IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.season)"
+    )
+    tx.run(
+        "CREATE INDEX played_in_season_gw IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.season, r.GW_number)"
+    )
+    tx.run(
+        "CREATE INDEX played_in_kickoff_time IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.kickoff_time)"
+    )
+    tx.run(
+        "CREATE INDEX played_in_is_home IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.is_home)"
+    )
+    tx.run(
+        "CREATE INDEX played_in_opponent IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.opponent)"
+    )
+    # Keyset paging key of generate_embeddings.fetch_rows
+    tx.run(
+        "CREATE INDEX played_in_row_hash IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.row_hash)"
+    )
+    tx.run(
+        "CREATE INDEX plays_for_season IF NOT EXISTS FOR ()-[r:PLAYS_FOR]-() ON (r.season)"
+    )
+    tx.run(
+        "CREATE INDEX fixture_gw IF NOT EXISTS FOR (f:Fixture) ON (f.season, f.GW_number)"
+    )
 
 
 def create_data(tx, row):
@@ -53,10 +147,12 @@ def create_data(tx, row):
         """
         MERGE (f:Fixture {season: $season, fixture_number: toInteger($fixture)})
         ON CREATE SET f.kickoff_time = $kickoff_time
+        SET f.GW_number = toInteger($GW)
     """,
         season=row["season"],
         fixture=row["fixture"],
         kickoff_time=row["kickoff_time"],
+        GW=row["GW"],
     )
 
     # Teams
@@ -136,6 +232,19 @@ def create_data(tx, row):
         position=row["position"],
     )
 
+    # (Player) -[:PLAYS_FOR {season}]-> (Team)
+    tx.run(
+        """
+        MATCH (p:Player {player_name: $name, player_element: toInteger($element)})
+        MATCH (t:Team {name: $team})
+        MERGE (p)-[:PLAYS_FOR {season: $season}]->(t)
+    """,
+        name=row["name"],
+        element=row["element"],
+        team=row["team"],
+        season=row["season"],
+    )
+
     # (Player) -[:PLAYED_IN]-> (Fixture) with properties
     # Converting numerical properties to appropriate types (integers/floats)
     tx.run(
@@ -161,7 +270,13 @@ def create_data(tx, row):
             r.creativity = toFloat($creativity),
             r.threat = toFloat($threat),
             r.ict_index = toFloat($ict_index),
-            r.form = toFloat($form)
+            r.form = toFloat($form),
+            r.row_hash = $row_hash,
+            r.season = $season,
+            r.GW_number = toInteger($GW),
+            r.kickoff_time = $kickoff_time,
+            r.is_home = $is_home,
+            r.opponent = $opponent
     """,
         name=row["name"],
         element=row["element"],
@@ -186,21 +301,914 @@ def create_data(tx, row):
         threat=row["threat"],
         ict_index=row["ict_index"],
         form=row["form"],
+        row_hash=row["row_hash"],
+        GW=row["GW"],
+        kickoff_time=row["kickoff_time"],
+        is_home=bool(row["is_home"]),
+        opponent=row["opponent"],
+    )
+
+
+# =========================
+# BATCH (UNWIND) LOADER
+# =========================
+
+_PLAYED_IN_SET = ",\n            ".join(
+    f"r.{prop} = row.{prop}" for prop in PLAYED_IN_PROPS
+)
+
+NODE_QUERIES = {
+    "Season": """
+        UNWIND $rows AS row
+        MERGE (:Season {season_name: row.season})
+    """,
+    "Gameweek": """
+        UNWIND $rows AS row
+        MERGE (:Gameweek {season: row.season, GW_number: row.GW})
+    """,
+    "Fixture": """
+        UNWIND $rows AS row
+        MERGE (f:Fixture {season: row.season, fixture_number: row.fixture})
+        SET f.kickoff_time = row.kickoff_time,
+            f.GW_number = row.GW
+    """,
+    "Team": """
+        UNWIND $rows AS row
+        MERGE (:Team {name: row.name})
+    """,
+    "Player": """
+        UNWIND $rows AS row
+        MERGE (:Player {player_name: row.name, player_element: row.element})
+    """,
+    "Position": """
+        UNWIND $rows AS row
+        MERGE (:Position {name: row.position})
+    """,
+}
+
+RELATIONSHIP_QUERIES = {
+    "HAS_GW": """
+        UNWIND $rows AS row
+        MATCH (s:Season {season_name: row.season})
+        MATCH (g:Gameweek {season: row.season, GW_number: row.GW})
+        MERGE (s)-[:HAS_GW]->(g)
+    """,
+    "HAS_FIXTURE": """
+        UNWIND $rows AS row
+        MATCH (g:Gameweek {season: row.season, GW_number: row.GW})
+        MATCH (f:Fixture {season: row.season, fixture_number: row.fixture})
+        MERGE (g)-[:HAS_FIXTURE]->(f)
+    """,
+    "HAS_HOME_TEAM": """
+        UNWIND $rows AS row
+        MATCH (f:Fixture {season: row.season, fixture_number: row.fixture})
+        MATCH (t:Team {name: row.home_team})
+        MERGE (f)-[:HAS_HOME_TEAM]->(t)
+    """,
+    "HAS_AWAY_TEAM": """
+        UNWIND $rows AS row
+        MATCH (f:Fixture {season: row.season, fixture_number: row.fixture})
+        MATCH (t:Team {name: row.away_team})
+        MERGE (f)-[:HAS_AWAY_TEAM]->(t)
+    """,
+    "PLAYS_AS": """
+        UNWIND $rows AS row
+        MATCH (p:Player {player_name: row.name, player_element: row.element})
+        MATCH (pos:Position {name: row.position})
+        MERGE (p)-[:PLAYS_AS]->(pos)
+    """,
+    "PLAYS_FOR": """
+        UNWIND $rows AS row
+        MATCH (p:Player {player_name: row.name, player_element: row.element})
+        MATCH (t:Team {name: row.team})
+        MERGE (p)-[:PLAYS_FOR {season: row.season}]->(t)
+    """,
+    "PLAYED_IN": f"""
+        UNWIND $rows AS row
+        MATCH (p:Player {{player_name: row.name, player_element: row.element}})
+        MATCH (f:Fixture {{season: row.season, fixture_number: row.fixture}})
+        MERGE (p)-[r:PLAYED_IN]->(f)
+        SET {_PLAYED_IN_SET},
+            r.row_hash = row.row_hash,
+            r.season = row.season,
+            r.GW_number = row.GW,
+            r.kickoff_time = row.kickoff_time,
+            r.is_home = row.is_home,
+            r.opponent = row.opponent
+    """,
+}
+
+
+def cast_types(df):
+    """Fill missing values and cast key/stat columns to the types stored in the graph."""
+    df = df.fillna(0)
+    for col in ["GW", "fixture", "element"] + PLAYED_IN_INT_PROPS:
+        df[col] = df[col].astype("int64")
+    for col in PLAYED_IN_FLOAT_PROPS:
+        df[col] = df[col].astype("float64")
+    return df
+
+
+def _coded(values, codes):
+    # Small-int codes of string values, shared across chunks through `codes`
+    labels, uniques = pd.factorize(values.astype(str))
+    lookup = np.array(
+        [codes.setdefault(value, len(codes)) for value in uniques], dtype="int32"
+    )
+    return lookup[labels]
+
+
+def team_key_codes(chunk, codes):
+    """
+    One chunk's TEAM_KEY_COLUMNS as integer columns: element and fixture as
+    numbers, the strings as codes shared across chunks through `codes`.
+    """
+    keys = chunk[TEAM_KEY_COLUMNS].fillna({"element": 0, "fixture": 0})
+    return pd.DataFrame(
+        {
+            "name": _coded(keys["name"], codes),
+            "element": keys["element"].astype("int64").to_numpy(),
+            "season": _coded(keys["season"], codes),
+            "fixture": keys["fixture"].astype("int64").to_numpy(),
+            "kickoff": _coded(keys["kickoff_time"], codes),
+            "home": _coded(keys["home_team"], codes),
+            "away": _coded(keys["away_team"], codes),
+        }
+    )
+
+
+def player_teams(chunks):
+    """
+    The club each player turned out for in each of their fixtures, as a
+    Series indexed by (name, element, season, fixture). `chunks` is an
+    iterable of frames with TEAM_KEY_COLUMNS, e.g. [df] or read_csv chunks;
+    duplicate rows keep the last, like MERGE.
+
+    Between chunks only integer codes of the key columns are kept (about 40
+    bytes per row, strings stored once), so batch mode's first pass is
+    chunked too; it is still O(rows), since every row gets its own club.
+
+    The CSV has no team column, but a player's club is on their fixtures
+    either side of a row while the opponent rarely is. Each row is decided
+    by the player's fixtures nearest in kickoff order, widening up to
+    TEAM_WINDOW either side, so a mid-season transfer switches club at the
+    transfer date. Rows that stay tied (a player's only fixture of the
+    season, or a transfer match against the former club with as many
+    fixtures for each club around it) take the club with more fixtures
+    that season, or the home side if those tie too, and are reported.
+    """
+    codes = {}
+    keys = pd.concat(
+        [team_key_codes(chunk, codes) for chunk in chunks], ignore_index=True
     )
+    strings = np.array(list(codes), dtype=object)
+    # Kickoff codes in time order (kickoff_time is ISO text)
+    kickoff_rank = np.empty(len(strings), dtype="int64")
+    kickoff_rank[np.argsort(strings.astype(str), kind="stable")] = np.arange(
+        len(strings)
+    )
+    keys["kickoff"] = kickoff_rank[keys["kickoff"].to_numpy()]
+    keys = keys.drop_duplicates(["name", "element", "season", "fixture"], keep="last")
+    keys = keys.sort_values(["name", "element", "season", "kickoff", "fixture"])
+
+    teams, ambiguous = [], []
+    for (name, element, season), rows in keys.groupby(
+        ["name", "element", "season"], sort=False
+    ):
+        sides = list(zip(rows["home"].tolist(), rows["away"].tolist()))
+        season_counts = Counter(team for pair in sides for team in pair)
+        for i, (fixture, (home, away)) in enumerate(zip(rows["fixture"], sides)):
+            team = None
+            for width in range(1, TEAM_WINDOW + 1):
+                near = sides[max(0, i - width) : i] + sides[i + 1 : i + 1 + width]
+                home_near = sum(home in pair for pair in near)
+                away_near = sum(away in pair for pair in near)
+                if home_near != away_near:
+                    team = home if home_near > away_near else away
+                    break
+            if team is None:
+                team = home if season_counts[home] >= season_counts[away] else away
+                ambiguous.append(
+                    f"{strings[name]} ({strings[season]}) fixture {fixture}: "
+                    f"{strings[home]} v {strings[away]} -> {strings[team]}"
+                )
+            teams.append(team)
+
+    if ambiguous:
+        print(
+            f"Club undecided by nearby fixtures for {len(ambiguous)} player-fixtures; "
+            "used the club with more fixtures that season (home on a tie):"
+        )
+        for line in ambiguous[:AMBIGUOUS_REPORT_LIMIT]:
+            print(f"  {line}")
+        if len(ambiguous) > AMBIGUOUS_REPORT_LIMIT:
+            print(f"  ... and {len(ambiguous) - AMBIGUOUS_REPORT_LIMIT} more")
+
+    index = pd.MultiIndex.from_arrays(
+        [
+            strings[keys["name"].to_numpy()],
+            keys["element"].to_numpy(),
+            strings[keys["season"].to_numpy()],
+            keys["fixture"].to_numpy(),
+        ],
+        names=["name", "element", "season", "fixture"],
+    )
+    return pd.Series(strings[np.array(teams, dtype="int64")], index=index)
+
+
+def assign_home_flags(df, teams):
+    """
+    Add is_home (the side of the fixture the player's own team was on), team
+    and opponent, from the per-fixture clubs worked out by player_teams.
+    """
+    keys = pd.MultiIndex.from_frame(df[["name", "element", "season", "fixture"]])
+    team = teams.reindex(keys).to_numpy()
+    is_home = team == df["home_team"].to_numpy()
+    return df.assign(
+        is_home=is_home,
+        team=df["home_team"].where(is_home, df["away_team"]),
+        opponent=df["away_team"].where(is_home, df["home_team"]),
+    )
+
+
+def with_home_flags(df):
+    return assign_home_flags(df, player_teams([df]))
+
+
+def row_hashes(df):
+    """
+    Content fingerprint of each player-fixture row: keys, fixture context
+    (gameweek, kickoff, teams) and PLAYED_IN properties, so a rescheduled
+    fixture or a corrected team also counts as a changed row.
+    """
+    cols = [
+        "name",
+        "element",
+        "season",
+        "fixture",
+        "GW",
+        "kickoff_time",
+        "home_team",
+        "away_team",
+    ] + PLAYED_IN_PROPS
+    joined = df[cols].astype(str).agg("|".join, axis=1)
+    return joined.map(lambda text: hashlib.sha1(text.encode()).hexdigest())
+
+
+def node_frames(df):
+    """Distinct node keys per label, deduplicated in pandas before they hit Neo4j."""
+    teams = pd.concat([df["home_team"], df["away_team"]]).drop_duplicates()
+    return {
+        "Season": df[["season"]].drop_duplicates(),
+        "Gameweek": df[["season", "GW"]].drop_duplicates(),
+        "Fixture": df[["season", "fixture", "GW", "kickoff_time"]].drop_duplicates(
+            subset=["season", "fixture"]
+        ),
+        "Team": pd.DataFrame({"name": teams}),
+        "Player": df[["name", "element"]].drop_duplicates(),
+        "Position": df[["position"]].drop_duplicates(),
+    }
+
+
+def relationship_frames(df):
+    """Distinct relationship endpoints (plus properties) per relationship type."""
+    return {
+        "HAS_GW": df[["season", "GW"]].drop_duplicates(),
+        "HAS_FIXTURE": df[["season", "GW", "fixture"]].drop_duplicates(),
+        "HAS_HOME_TEAM": df[["season", "fixture", "home_team"]].drop_duplicates(),
+        "HAS_AWAY_TEAM": df[["season", "fixture", "away_team"]].drop_duplicates(),
+        "PLAYS_AS": df[["name", "element", "position"]].drop_duplicates(),
+        "PLAYS_FOR": df[["name", "element", "season", "team"]].drop_duplicates(),
+        "PLAYED_IN": df[
+            ["name", "element", "season", "fixture", "GW", "kickoff_time"]
+            + ["is_home", "opponent"]
+            + PLAYED_IN_PROPS
+        ].assign(row_hash=row_hashes(df)),
+    }
+
+
+def run_batch(tx, query, rows):
+    tx.run(query, rows=rows)
+
+
+def write_with_retry(session, query, rows, retries=MAX_RETRIES):
+    # execute_write already retries internally; this adds backoff + logging on
+    # top for deadlocks between concurrent writers that outlast its retry window
+    for attempt in range(1, retries + 1):
+        try:
+            return session.execute_write(run_batch, query, rows)
+        except TransientError as e:
+            if attempt == retries:
+                raise
+            wait = 0.2 * 2**attempt + random.random()
+            print(f"Transient error ({e.code}), retry {attempt} in {wait:.1f}s...")
+            time.sleep(wait)
+
+
+def write_frame(session, query, frame, batch_size=BATCH_SIZE):
+    for offset in range(0, len(frame), batch_size):
+        rows = frame.iloc[offset : offset + batch_size].to_dict("records")
+        write_with_retry(session, query, rows)
+
+
+def load_chunk(session, chunk):
+    # Nodes first so every relationship MATCH finds both endpoints
+    for label, frame in node_frames(chunk).items():
+        write_with_retry(session, NODE_QUERIES[label], frame.to_dict("records"))
+    for rel_type, frame in relationship_frames(chunk).items():
+        write_with_retry(
+            session, RELATIONSHIP_QUERIES[rel_type], frame.to_dict("records")
+        )
+
+
+def read_csv_chunks(path, chunksize=BATCH_SIZE):
+    """
+    Stream the CSV in bounded chunks, filling and casting each chunk on its own,
+    so at most one chunk of full rows is in memory regardless of the file size.
+    """
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield cast_types(chunk)
+
+
+def frame_chunks(df, batch_size=BATCH_SIZE):
+    for offset in range(0, len(df), batch_size):
+        yield df.iloc[offset : offset + batch_size]
+
+
+def load_batched(session, chunks):
+    """
+    Load an iterable of row chunks, one UNWIND statement per node label /
+    relationship type per chunk, printing throughput as it goes.
+    """
+    start = time.perf_counter()
+    loaded = 0
+    for chunk in chunks:
+        load_chunk(session, chunk)
+        loaded += len(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {loaded} rows ({loaded / elapsed:.0f} rows/sec)")
+    return loaded
+
+
+# =========================
+# MATERIALIZED AGGREGATES
+# =========================
+
+_SEASON_SUMS = ",\n         ".join(f"sum(r.{s}) AS sum_{s}" for s in AGGREGATE_STATS)
+_SEASON_SET = ",\n        ".join(f"ps.sum_{s} = sum_{s}" for s in AGGREGATE_STATS)
+_CAREER_SUMS = ",\n         ".join(
+    f"sum(ps.sum_{s}) AS sum_{s}" for s in AGGREGATE_STATS
+)
+_CAREER_SET = ",\n        ".join(f"p.sum_{s} = sum_{s}" for s in AGGREGATE_STATS)
+
+# Per-(player, season) totals recomputed from PLAYED_IN
+REFRESH_SEASON_AGGREGATES = f"""
+    UNWIND $rows AS row
+    MATCH (p:Player {{player_name: row.name, player_element: row.element}})-[r:PLAYED_IN]->(f:Fixture)
+    WITH p, f.season AS season,
+         count(r) AS matches_played,
+         {_SEASON_SUMS}
+    MERGE (ps:PlayerSeason {{player_name: p.player_name, player_element: p.player_element, season: season}})
+    SET ps.matches_played = matches_played,
+        {_SEASON_SET}
+    MERGE (p)-[:HAS_SEASON_STATS]->(ps)
+"""
+
+# Career totals rolled up from the (few) PlayerSeason nodes
+REFRESH_CAREER_AGGREGATES = f"""
+    UNWIND $rows AS row
+    MATCH (p:Player {{player_name: row.name, player_element: row.element}})-[:HAS_SEASON_STATS]->(ps:PlayerSeason)
+    WITH p,
+         sum(ps.matches_played) AS matches_played,
+         {_CAREER_SUMS}
+    SET p.matches_played = matches_played,
+        {_CAREER_SET}
+"""
+
+
+def fetch_player_keys(tx):
+    res = tx.run(
+        "MATCH (p:Player) RETURN p.player_name AS name, p.player_element AS element"
+    )
+    return [dict(r) for r in res]
+
+
+def refresh_aggregates(session, players=None, batch_size=BATCH_SIZE):
+    """
+    Recompute PlayerSeason and Player career totals for `players` (a frame of
+    name/element keys), or for every player when None. Loaders pass only the
+    players they touched, so a gameweek refresh stays incremental.
+    """
+    if players is None:
+        players = pd.DataFrame(
+            session.execute_read(fetch_player_keys), columns=["name", "element"]
+        )
+    write_frame(session, REFRESH_SEASON_AGGREGATES, players, batch_size)
+    write_frame(session, REFRESH_CAREER_AGGREGATES, players, batch_size)
+    print(f"Refreshed aggregates for {len(players)} players")
+
+
+def aggregate_frames(df):
+    """The same season and career totals computed in pandas (for import mode)."""
+    season_keys = ["name", "element", "season"]
+    seasons = df.groupby(season_keys)[AGGREGATE_STATS].sum().add_prefix("sum_")
+    seasons["matches_played"] = df.groupby(season_keys).size()
+    seasons = seasons.reset_index()
+    careers = (
+        seasons.drop(columns=["season"])
+        .groupby(["name", "element"])
+        .sum()
+        .reset_index()
+    )
+    return seasons, careers
+
+
+# =========================
+# PARALLEL LOADER
+# =========================
+
+
+def partition_players(df, partitions):
+    """
+    Split the rows into `partitions` groups of whole players (the Player key
+    name, element), so each Player node is written by exactly one worker.
+    Fixture nodes are still shared between workers; rows are sorted by
+    fixture so every worker locks them in the same order.
+    """
+    players = df[["name", "element"]].drop_duplicates().reset_index(drop=True)
+    players["partition"] = players.index % partitions
+    df = df.merge(players, on=["name", "element"])
+    return [
+        part.drop(columns=["partition"]).sort_values(["season", "fixture", "element"])
+        for _, part in df.groupby("partition")
+    ]
+
+
+def _load_partition(driver, batches):
+    # Deadlocks on the shared Fixture nodes are TransientErrors, retried with
+    # backoff by write_with_retry
+    with driver.session() as session:
+        for rows in batches:
+            write_with_retry(session, RELATIONSHIP_QUERIES["PLAYED_IN"], rows)
+    return sum(len(rows) for rows in batches)
+
+
+def load_parallel(driver, df, batch_size=BATCH_SIZE, workers=None):
+    """
+    Two-pass parallel load.
+
+    Pass 1 (single session): every node plus the structural relationships
+    (HAS_GW, HAS_FIXTURE, HAS_HOME_TEAM, HAS_AWAY_TEAM, PLAYS_AS, PLAYS_FOR), which are
+    shared across fixtures. Pass 2: PLAYED_IN relationships written by a pool
+    of worker sessions, one partition of whole players each.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    with driver.session() as session:
+        for label, frame in node_frames(df).items():
+            write_frame(session, NODE_QUERIES[label], frame, batch_size)
+        for rel_type, frame in relationship_frames(df).items():
+            if rel_type != "PLAYED_IN":
+                write_frame(session, RELATIONSHIP_QUERIES[rel_type], frame, batch_size)
+    print(f"Merged shared nodes in {time.perf_counter() - start:.1f}s")
+
+    # Row batches are built here, so the worker threads only wait on the
+    # network (which releases the GIL) instead of running pandas
+    partitions = []
+    for part in partition_players(df, workers):
+        played_in = relationship_frames(part)["PLAYED_IN"]
+        partitions.append(
+            [
+                played_in.iloc[offset : offset + batch_size].to_dict("records")
+                for offset in range(0, len(played_in), batch_size)
+            ]
+        )
+    print(f"Writing PLAYED_IN from {len(partitions)} worker sessions...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = sum(
+            pool.map(lambda batches: _load_partition(driver, batches), partitions)
+        )
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {loaded} rows ({loaded / elapsed:.0f} rows/sec)")
+    return loaded
+
+
+# =========================
+# DELTA (INCREMENTAL) LOADER
+# =========================
+
+
+def fetch_watermarks(tx):
+    res = tx.run(
+        """
+        MATCH (g:Gameweek)
+        WHERE g.ingest_digest IS NOT NULL
+        RETURN g.season AS season, g.GW_number AS GW, g.ingest_digest AS digest
+        """
+    )
+    return {(r["season"], r["GW"]): r["digest"] for r in res}
+
+
+def fetch_row_hashes(tx, fixtures):
+    # Looked up by fixture key, not the Gameweek link: a fixture rescheduled
+    # into another gameweek is still linked to its old one
+    res = tx.run(
+        """
+        UNWIND $fixtures AS fx
+        MATCH (f:Fixture {season: fx.season, fixture_number: fx.fixture})
+        MATCH (p:Player)-[r:PLAYED_IN]->(f)
+        RETURN p.player_name AS name,
+               p.player_element AS element,
+               f.season AS season,
+               f.fixture_number AS fixture,
+               r.row_hash AS stored_hash
+        """,
+        fixtures=fixtures,
+    )
+    return [dict(r) for r in res]
+
+
+def set_watermarks(tx, rows):
+    tx.run(
+        """
+        UNWIND $rows AS row
+        MATCH (g:Gameweek {season: row.season, GW_number: row.GW})
+        SET g.ingest_digest = row.digest,
+            g.ingested_at = datetime()
+        """,
+        rows=rows,
+    )
+
+
+# Gameweek and team links of fixtures about to be rewritten; the delta load
+# MERGEs them back from the new rows, so a moved fixture loses the old ones
+UNLINK_FIXTURES = """
+    UNWIND $rows AS row
+    MATCH (f:Fixture {season: row.season, fixture_number: row.fixture})
+    CALL {
+        WITH f
+        MATCH (:Gameweek)-[gw:HAS_FIXTURE]->(f)
+        DELETE gw
+    }
+    CALL {
+        WITH f
+        MATCH (f)-[side:HAS_HOME_TEAM|HAS_AWAY_TEAM]->(:Team)
+        DELETE side
+    }
+"""
+
+
+def load_delta(session, df, batch_size=BATCH_SIZE):
+    """
+    Write only new or changed PLAYED_IN rows.
+
+    Every Gameweek node keeps a digest of the row hashes it was last loaded with
+    (its watermark). Gameweeks whose digest still matches are skipped outright;
+    for the rest, stored per-row hashes decide what is inserted or updated.
+    Returns {"inserted": n, "updated": n, "unchanged": n}.
+    """
+    df = df.assign(row_hash=row_hashes(df))
+    digests = (
+        df.groupby(["season", "GW"])["row_hash"]
+        .agg(lambda h: hashlib.sha1("".join(sorted(h)).encode()).hexdigest())
+        .reset_index(name="digest")
+    )
+
+    watermarks = session.execute_read(fetch_watermarks)
+    stale = digests[
+        [
+            watermarks.get((season, gw)) != digest
+            for season, gw, digest in digests.itertuples(index=False)
+        ]
+    ]
+    candidates = df.merge(stale[["season", "GW"]], on=["season", "GW"])
+    skipped = len(df) - len(candidates)
+
+    stored = pd.DataFrame(
+        session.execute_read(
+            fetch_row_hashes,
+            candidates[["season", "fixture"]].drop_duplicates().to_dict("records"),
+        ),
+        columns=["name", "element", "season", "fixture", "stored_hash"],
+    )
+    candidates = candidates.merge(
+        stored, on=["name", "element", "season", "fixture"], how="left"
+    )
+    inserted = candidates["stored_hash"].isna()
+    updated = ~inserted & (candidates["stored_hash"] != candidates["row_hash"])
+    changed = candidates[inserted | updated].drop(columns=["stored_hash"])
+
+    print(f"{len(stale)} of {len(digests)} gameweeks changed since the last load")
+    if len(changed):
+        fixtures = changed[["season", "fixture"]].drop_duplicates()
+        write_frame(session, UNLINK_FIXTURES, fixtures, batch_size)
+        load_batched(session, frame_chunks(changed, batch_size))
+        refresh_aggregates(
+            session, changed[["name", "element"]].drop_duplicates(), batch_size
+        )
+    session.execute_write(set_watermarks, stale.to_dict("records"))
+
+    return {
+        "inserted": int(inserted.sum()),
+        "updated": int(updated.sum()),
+        "unchanged": skipped + int((~inserted & ~updated).sum()),
+    }
+
+
+def refresh_facts_store(df, path=None):
+    """
+    Rebuild the DuckDB facts store (create_facts_db.py) from df when one
+    exists, so SQL-backed answers do not go stale after any load.
+    df None (batch mode, which never holds the whole CSV) only warns.
+    """
+    try:
+        from create_facts_db import DUCKDB_PATH, fact_frame, write_facts
+    except ImportError as e:
+        print(f"Facts store not refreshed ({e}); rerun create_facts_db.py")
+        return
+    path = path or DUCKDB_PATH
+    if not os.path.exists(path):
+        return
+    if df is None:
+        print(
+            f"The facts store {path} still holds the previous data; "
+            "rerun scripts/create_facts_db.py"
+        )
+        return
+    count = write_facts(fact_frame(df), path)
+    print(f"Refreshed {count} rows in the facts store {path}")
+
+
+# =========================
+# OFFLINE IMPORT EXPORT
+# =========================
+
+
+def _node_id(*cols):
+    # Synthetic ID for composite keys; only used to wire up relationships
+    key = cols[0].astype(str)
+    for col in cols[1:]:
+        key = key + "|" + col.astype(str)
+    return key
+
+
+def import_node_frames(df):
+    """Node CSVs in neo4j-admin import format, keyed by output filename."""
+    nodes = node_frames(df)
+    gws = nodes["Gameweek"]
+    fixtures = nodes["Fixture"]
+    seasons, careers = aggregate_frames(df)
+    players = nodes["Player"].merge(careers, on=["name", "element"], how="left")
+
+    player_out = pd.DataFrame(
+        {
+            ":ID(Player)": _node_id(players["name"], players["element"]),
+            "player_name": players["name"],
+            "player_element:int": players["element"],
+            "matches_played:int": players["matches_played"],
+        }
+    )
+    player_season_out = pd.DataFrame(
+        {
+            ":ID(PlayerSeason)": _node_id(
+                seasons["name"], seasons["element"], seasons["season"]
+            ),
+            "player_name": seasons["name"],
+            "player_element:int": seasons["element"],
+            "season": seasons["season"],
+            "matches_played:int": seasons["matches_played"],
+        }
+    )
+    for stat in AGGREGATE_STATS:
+        header = f"sum_{stat}:{'int' if stat in PLAYED_IN_INT_PROPS else 'float'}"
+        player_out[header] = players[f"sum_{stat}"]
+        player_season_out[header] = seasons[f"sum_{stat}"]
+    player_out[":LABEL"] = "Player"
+    player_season_out[":LABEL"] = "PlayerSeason"
+
+    return {
+        "seasons.csv": pd.DataFrame(
+            {"season_name:ID(Season)": nodes["Season"]["season"], ":LABEL": "Season"}
+        ),
+        "gameweeks.csv": pd.DataFrame(
+            {
+                ":ID(Gameweek)": _node_id(gws["season"], gws["GW"]),
+                "season": gws["season"],
+                "GW_number:int": gws["GW"],
+                ":LABEL": "Gameweek",
+            }
+        ),
+        "fixtures.csv": pd.DataFrame(
+            {
+                ":ID(Fixture)": _node_id(fixtures["season"], fixtures["fixture"]),
+                "season": fixtures["season"],
+                "fixture_number:int": fixtures["fixture"],
+                "GW_number:int": fixtures["GW"],
+                "kickoff_time": fixtures["kickoff_time"],
+                ":LABEL": "Fixture",
+            }
+        ),
+        "teams.csv": pd.DataFrame(
+            {"name:ID(Team)": nodes["Team"]["name"], ":LABEL": "Team"}
+        ),
+        "players.csv": player_out,
+        "positions.csv": pd.DataFrame(
+            {"name:ID(Position)": nodes["Position"]["position"], ":LABEL": "Position"}
+        ),
+        "player_seasons.csv": player_season_out,
+    }
+
+
+def import_relationship_frames(df):
+    """Relationship CSVs in neo4j-admin import format, keyed by output filename."""
+    rels = relationship_frames(df)
+    has_gw = rels["HAS_GW"]
+    has_fixture = rels["HAS_FIXTURE"]
+    home = rels["HAS_HOME_TEAM"]
+    away = rels["HAS_AWAY_TEAM"]
+    plays_as = rels["PLAYS_AS"]
+    plays_for = rels["PLAYS_FOR"]
+    played_in = rels["PLAYED_IN"]
+    seasons, _ = aggregate_frames(df)
+
+    played_in_out = pd.DataFrame(
+        {
+            ":START_ID(Player)": _node_id(played_in["name"], played_in["element"]),
+            ":END_ID(Fixture)": _node_id(played_in["season"], played_in["fixture"]),
+        }
+    )
+    for prop in PLAYED_IN_INT_PROPS:
+        played_in_out[f"{prop}:int"] = played_in[prop]
+    for prop in PLAYED_IN_FLOAT_PROPS:
+        played_in_out[f"{prop}:float"] = played_in[prop]
+    played_in_out["row_hash"] = played_in["row_hash"]
+    played_in_out["season"] = played_in["season"]
+    played_in_out["GW_number:int"] = played_in["GW"]
+    played_in_out["kickoff_time"] = played_in["kickoff_time"]
+    played_in_out["is_home:boolean"] = played_in["is_home"].map(str).str.lower()
+    played_in_out["opponent"] = played_in["opponent"]
+    played_in_out[":TYPE"] = "PLAYED_IN"
+
+    return {
+        "has_gw.csv": pd.DataFrame(
+            {
+                ":START_ID(Season)": has_gw["season"],
+                ":END_ID(Gameweek)": _node_id(has_gw["season"], has_gw["GW"]),
+                ":TYPE": "HAS_GW",
+            }
+        ),
+        "has_fixture.csv": pd.DataFrame(
+            {
+                ":START_ID(Gameweek)": _node_id(
+                    has_fixture["season"], has_fixture["GW"]
+                ),
+                ":END_ID(Fixture)": _node_id(
+                    has_fixture["season"], has_fixture["fixture"]
+                ),
+                ":TYPE": "HAS_FIXTURE",
+            }
+        ),
+        "has_home_team.csv": pd.DataFrame(
+            {
+                ":START_ID(Fixture)": _node_id(home["season"], home["fixture"]),
+                ":END_ID(Team)": home["home_team"],
+                ":TYPE": "HAS_HOME_TEAM",
+            }
+        ),
+        "has_away_team.csv": pd.DataFrame(
+            {
+                ":START_ID(Fixture)": _node_id(away["season"], away["fixture"]),
+                ":END_ID(Team)": away["away_team"],
+                ":TYPE": "HAS_AWAY_TEAM",
+            }
+        ),
+        "plays_as.csv": pd.DataFrame(
+            {
+                ":START_ID(Player)": _node_id(plays_as["name"], plays_as["element"]),
+                ":END_ID(Position)": plays_as["position"],
+                ":TYPE": "PLAYS_AS",
+            }
+        ),
+        "plays_for.csv": pd.DataFrame(
+            {
+                ":START_ID(Player)": _node_id(plays_for["name"], plays_for["element"]),
+                ":END_ID(Team)": plays_for["team"],
+                "season": plays_for["season"],
+                ":TYPE": "PLAYS_FOR",
+            }
+        ),
+        "played_in.csv": played_in_out,
+        "has_season_stats.csv": pd.DataFrame(
+            {
+                ":START_ID(Player)": _node_id(seasons["name"], seasons["element"]),
+                ":END_ID(PlayerSeason)": _node_id(
+                    seasons["name"], seasons["element"], seasons["season"]
+                ),
+                ":TYPE": "HAS_SEASON_STATS",
+            }
+        ),
+    }
+
+
+def export_import_files(df, out_dir=IMPORT_DIR):
+    """
+    Write the dataset as node/relationship CSVs for `neo4j-admin database import`
+    and return the matching command line. Node keys are deduplicated in pandas,
+    so the importer never sees a duplicate ID.
+    """
+    # One PLAYED_IN per player-fixture, the last row winning as with MERGE ... SET
+    # in the other modes; the pandas season / career totals use the same rows
+    df = df.drop_duplicates(["name", "element", "season", "fixture"], keep="last")
+    os.makedirs(out_dir, exist_ok=True)
+    node_args = []
+    rel_args = []
+    for filename, frame in import_node_frames(df).items():
+        path = os.path.join(out_dir, filename)
+        frame.to_csv(path, index=False)
+        node_args.append(f"--nodes={path}")
+        print(f"Wrote {len(frame)} nodes to {path}")
+    for filename, frame in import_relationship_frames(df).items():
+        path = os.path.join(out_dir, filename)
+        frame.to_csv(path, index=False)
+        rel_args.append(f"--relationships={path}")
+        print(f"Wrote {len(frame)} relationships to {path}")
+
+    return " ".join(
+        ["neo4j-admin database import full neo4j --overwrite-destination"]
+        + node_args
+        + rel_args
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the FPL knowledge graph.")
+    parser.add_argument(
+        "--mode",
+        choices=["batch", "row", "import", "delta", "parallel"],
+        default="batch",
+        help=(
+            "batch: UNWIND chunks (default), row: one transaction per CSV row, "
+            "import: write neo4j-admin import CSVs for an offline rebuild, "
+            "delta: write only new or changed player-fixture rows, "
+            "parallel: PLAYED_IN written from a pool of worker sessions"
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Rows per UNWIND statement in batch mode (default {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Worker sessions in parallel mode (default: CPU count)",
+    )
+    parser.add_argument("--csv", default=CSV_PATH, help="Input CSV path")
+    parser.add_argument(
+        "--import-dir",
+        default=IMPORT_DIR,
+        help=f"Output directory for import mode (default {IMPORT_DIR})",
+    )
+    parser.add_argument(
+        "--schema-only",
+        action="store_true",
+        help=(
+            "Only create constraints and indexes, loading no data "
+            "(e.g. after a neo4j-admin import); ignores --mode"
+        ),
+    )
+    parser.add_argument(
+        "--skip-index-check",
+        action="store_true",
+        help="Do not sync template indexes or check template plans after loading",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+
     # Load Configuration
     config = read_config()
     uri = config.get("URI", "neo4j://localhost:7687")
     username = config.get("USERNAME", "neo4j")
     password = config.get("PASSWORD", "password")
 
-    # Load Data
-    print("Loading CSV data...")
-    df = pd.read_csv("fpl_two_seasons.csv")
-    # Ensure no NaN values in critical columns or handle them
-    df = df.fillna(0)
+    if args.mode == "import" and not args.schema_only:
+        # Offline rebuild: no database connection, just the import files
+        print("Loading CSV data...")
+        df = with_home_flags(cast_types(pd.read_csv(args.csv)))
+        command = export_import_files(df, args.import_dir)
+        refresh_facts_store(df)
+        print("Import files written. Stop the database, then run:")
+        print(command)
+        print("Start the database, then create the constraints and indexes with:")
+        print("python scripts/create_kg.py --schema-only")
+        return
 
     # Connect to Neo4j
     driver = GraphDatabase.driver(uri, auth=(username, password))
@@ -209,14 +1217,70 @@ def main():
         print("Creating Constraints...")
         session.execute_write(create_constraints)
 
-        print("Building Knowledge Graph (this may take some time)...")
-        for index, row in df.iterrows():
-            if index % 100 == 0:
-                print(f"Processing row {index}...")
-            session.execute_write(create_data, row)
+        session.execute_write(create_indexes)
+
+        if args.schema_only:
+            print("Schema only: constraints and indexes created, no data loaded.")
+        elif args.mode == "batch":
+            # Streams the CSV: only one chunk of full rows is ever held in
+            # memory. A first pass, also chunked, works out each player's
+            # team per fixture; it keeps integer codes of the key columns
+            # for every row (O(rows), about 40 bytes each).
+            print(f"Streaming {args.csv} in chunks of {args.batch_size} rows...")
+            teams = player_teams(
+                pd.read_csv(
+                    args.csv, usecols=TEAM_KEY_COLUMNS, chunksize=args.batch_size
+                )
+            )
+            chunks = (
+                assign_home_flags(chunk, teams)
+                for chunk in read_csv_chunks(args.csv, args.batch_size)
+            )
+            load_batched(session, chunks)
+            refresh_aggregates(session, batch_size=args.batch_size)
+            refresh_facts_store(None)
+        else:
+            # Load Data
+            print("Loading CSV data...")
+            df = pd.read_csv(args.csv)
+            # Ensure no NaN values in critical columns or handle them
+            df = with_home_flags(cast_types(df))
+
+            if args.mode == "parallel":
+                print(f"Building Knowledge Graph with {args.workers} workers...")
+                load_parallel(driver, df, args.batch_size, args.workers)
+                refresh_aggregates(session, batch_size=args.batch_size)
+                refresh_facts_store(df)
+            elif args.mode == "delta":
+                print("Applying gameweek delta...")
+                counts = load_delta(session, df, args.batch_size)
+                print(
+                    f"Inserted {counts['inserted']}, updated {counts['updated']}, "
+                    f"unchanged {counts['unchanged']} rows."
+                )
+                if counts["inserted"] or counts["updated"]:
+                    refresh_facts_store(df)
+            else:
+                print("Building Knowledge Graph (this may take some time)...")
+                df = df.assign(row_hash=row_hashes(df))
+                for index, row in df.iterrows():
+                    if index % 100 == 0:
+                        print(f"Processing row {index}...")
+                    session.execute_write(create_data, row)
+                refresh_aggregates(session, batch_size=args.batch_size)
+                refresh_facts_store(df)
+
+        failures = {}
+        if not args.skip_index_check:
+            # Runs last so the plan check sees the loaded data's statistics
+            import manage_indexes
+
+            failures = manage_indexes.run(session)
 
     driver.close()
     print("Knowledge Graph created successfully.")
+    if failures:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
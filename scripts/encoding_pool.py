@@ -0,0 +1,208 @@
+# scripts/encoding_pool.py
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+import numpy as np
+
+# Allow imports from the repo root (modules/)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.encoders import ENCODER_BACKENDS, load_encoder  # noqa: E402
+
+# Texts sent to a worker per task
+CHUNK_SIZE = 64
+
+# sentence-transformers batch size inside each worker
+ENCODE_BATCH_SIZE = 32
+
+# Per-process state of a worker: thread count and loaded encoders by
+# (model name, backend)
+_worker_threads = 1
+_worker_models = {}
+
+
+def _init_worker(threads):
+    global _worker_threads
+    _worker_threads = threads
+
+
+def _worker_model(model_name, backend):
+    model = _worker_models.get((model_name, backend))
+    if model is None:
+        if backend == "torch":
+            import torch
+
+            torch.set_num_threads(_worker_threads)
+        model = load_encoder(model_name, backend, threads=_worker_threads)
+        _worker_models[(model_name, backend)] = model
+    return model
+
+
+def _dimension(model_name, backend):
+    return _worker_model(model_name, backend).get_sentence_embedding_dimension()
+
+
+def _encode_chunk(task):
+    model_name, backend, texts, batch_size = task
+    return _worker_model(model_name, backend).encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+    )
+
+
+class EncodingPool:
+    """
+    Shards sentence-transformers encoding across CPU worker processes.
+
+    Each worker runs with `threads_per_worker` torch (or ONNX Runtime)
+    threads and loads an encoder the first time it is asked for one, so one
+    pool serves every model and backend. Texts are split into fixed chunks
+    of `chunk_size` and the results are concatenated in input order, so the
+    output does not depend on which worker finishes first.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        threads_per_worker=1,
+        chunk_size=CHUNK_SIZE,
+        batch_size=ENCODE_BATCH_SIZE,
+    ):
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        # spawn: forking a process that already holds torch threads can deadlock
+        self._pool = mp.get_context("spawn").Pool(
+            self.workers, initializer=_init_worker, initargs=(threads_per_worker,)
+        )
+
+    def encode(self, model_name, texts, backend="torch"):
+        """Encode texts with the named model; rows are in input order."""
+        tasks = [
+            (model_name, backend, texts[i : i + self.chunk_size], self.batch_size)
+            for i in range(0, len(texts), self.chunk_size)
+        ]
+        # map returns chunk results in task order
+        chunks = self._pool.map(_encode_chunk, tasks, chunksize=1)
+        if not chunks:
+            return np.zeros((0, self.dimension(model_name, backend)), dtype="float32")
+        return np.concatenate(chunks)
+
+    def dimension(self, model_name, backend="torch"):
+        return self._pool.apply(_dimension, (model_name, backend))
+
+    def encoder(self, model_name, backend="torch"):
+        return PooledEncoder(self, model_name, backend)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PooledEncoder:
+    """Stand-in for a SentenceTransformer that encodes through an EncodingPool."""
+
+    def __init__(self, pool, model_name, backend="torch"):
+        self.pool = pool
+        self.model_name = model_name
+        self.backend = backend
+        self._dim = None
+
+    def get_sentence_embedding_dimension(self):
+        if self._dim is None:
+            self._dim = self.pool.dimension(self.model_name, self.backend)
+        return self._dim
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        return self.pool.encode(self.model_name, list(texts), self.backend)
+
+
+def add_pool_args(parser):
+    """--workers/--threads-per-worker/--chunk-size, shared by the encode scripts."""
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Encoding worker processes (0 = encode in this process)",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=1,
+        help="torch / ONNX Runtime threads per encoding worker",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help=f"Texts per worker task (default {CHUNK_SIZE})",
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure encoding throughput (texts/sec) for a pool configuration."
+    )
+    parser.add_argument(
+        "--model",
+        default="sentence-transformers/all-MiniLM-L6-v2",
+        help="sentence-transformers model name",
+    )
+    parser.add_argument(
+        "--backend", choices=ENCODER_BACKENDS, default="torch", help="Encoder backend"
+    )
+    parser.add_argument(
+        "--texts", type=int, default=5000, help="Number of synthetic texts to encode"
+    )
+    add_pool_args(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Shaped like generate_embeddings.build_text_description output
+    texts = [
+        f"Player: Player {i % 600} | Position: MID | Season: 2022-23 | "
+        f"Gameweek: {i % 38 + 1} | total_points: {i % 15} | goals_scored: {i % 3} | "
+        f"assists: {i % 2} | minutes: 90 | bps: {i % 40} | ict_index: {i % 20}.50 | "
+        f"Fixture: Team {i % 20} vs Team {(i + 7) % 20}"
+        for i in range(args.texts)
+    ]
+
+    if args.workers:
+        with EncodingPool(
+            args.workers, args.threads_per_worker, args.chunk_size
+        ) as pool:
+            # Warm-up so every worker has loaded the model before timing
+            pool.encode(
+                args.model, texts[: args.workers * args.chunk_size], args.backend
+            )
+            start = time.perf_counter()
+            vectors = pool.encode(args.model, texts, args.backend)
+            rate = len(texts) / (time.perf_counter() - start)
+        setup = f"{args.workers} workers x {args.threads_per_worker} threads"
+    else:
+        model = load_encoder(args.model, args.backend)
+        start = time.perf_counter()
+        vectors = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        rate = len(texts) / (time.perf_counter() - start)
+        setup = "single process"
+
+    print(
+        f"{args.model} [{args.backend}] ({setup}): "
+        f"{vectors.shape[0]} texts, {rate:.0f} texts/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
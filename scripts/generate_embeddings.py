@@ -1,15 +1,48 @@
 # scripts/generate_embeddings.py
 
-import json
+import argparse
+import hashlib
 import os
+import queue
+import sys
+import threading
 from neo4j import GraphDatabase
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
+import time
 from rapidfuzz import process, fuzz
 from datetime import datetime
 import math
 
+from encoding_pool import EncodingPool, add_pool_args
+
+# Allow imports from the repo root (modules/)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.faiss_index import (  # noqa: E402
+    INDEX_TYPES,
+    VECTOR_DTYPES,
+    build_index,
+    decode_vector,
+    encode_vectors,
+    flat_contents,
+)
+from modules.encoders import ENCODER_BACKENDS, load_encoder  # noqa: E402
+from modules.neo4j_vector_index import (  # noqa: E402
+    MODEL_LABELS,
+    create_vector_index,
+    fetch_vector_index_state,
+    label_embedding_nodes,
+)
+from modules.vector_store import (  # noqa: E402
+    SidecarVectors,
+    season_index_paths,
+    write_groups,
+    write_mapping,
+    write_metadata,
+    write_sidecar,
+)
+
 # ---------- CONFIG ----------
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -24,32 +57,48 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 FAISS_INDEX_A_PATH = os.path.join(OUTPUT_DIR, "faiss_index_modelA.index")
 FAISS_INDEX_B_PATH = os.path.join(OUTPUT_DIR, "faiss_index_modelB.index")
-MAPPING_A_PATH = os.path.join(OUTPUT_DIR, "idx_to_embedding_id_modelA.json")
-MAPPING_B_PATH = os.path.join(OUTPUT_DIR, "idx_to_embedding_id_modelB.json")
+MAPPING_A_PATH = os.path.join(OUTPUT_DIR, "idx_to_embedding_id_modelA.npy")
+MAPPING_B_PATH = os.path.join(OUTPUT_DIR, "idx_to_embedding_id_modelB.npy")
+
+# Embedding nodes written per UNWIND transaction
+WRITE_BATCH_SIZE = 500
+# Player-fixture rows per Neo4j read transaction
+FETCH_PAGE_SIZE = 2000
+# Rows encoded (and appended to the FAISS index) at a time
+ENCODE_BATCH_SIZE = 500
+# Batches buffered between pipeline stages; bounds peak memory
+QUEUE_SIZE = 2
 # ----------------------------
 
-# Load models
-model_a = SentenceTransformer(MODEL_A_NAME)
-model_b = SentenceTransformer(MODEL_B_NAME)
+# Per-model outputs, keyed by the tag stored on Embedding nodes
+MODEL_NAMES = {"modelA": MODEL_A_NAME, "modelB": MODEL_B_NAME}
+FAISS_INDEX_PATHS = {"modelA": FAISS_INDEX_A_PATH, "modelB": FAISS_INDEX_B_PATH}
+MAPPING_PATHS = {"modelA": MAPPING_A_PATH, "modelB": MAPPING_B_PATH}
 
 driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
 
 
-def fetch_rows(tx):
-    # Use Cypher from above: returns each player's played-in fixture instance
+def fetch_rows(tx, after_hash="", limit=FETCH_PAGE_SIZE):
+    # One page of player-fixture instances, keyset-paginated on the indexed
+    # PLAYED_IN row_hash (unique per row: it hashes the player/fixture keys)
     q = """
     MATCH (p:Player)-[played:PLAYED_IN]->(f:Fixture)
+    WHERE played.row_hash > $after_hash
+    WITH p, played, f
+    ORDER BY played.row_hash
+    LIMIT $limit
     MATCH (f)-[:HAS_HOME_TEAM]->(home:Team)
     MATCH (f)-[:HAS_AWAY_TEAM]->(away:Team)
     OPTIONAL MATCH (p)-[:PLAYS_AS]->(pos:Position)
-    OPTIONAL MATCH (f)<-[:HAS_FIXTURE]-(gw:Gameweek)-[:HAS_GW]-(s:Season)
     RETURN
+      played.row_hash AS row_hash,
       id(p) AS player_id,
       p.player_name AS player_name,
       p.player_element AS player_element,
       coalesce(pos.name, '') AS position,
-      gw.GW_number AS GW,
-      s.season_name AS season,
+      played.GW_number AS GW,
+      played.season AS season,
+      f.fixture_number AS fixture,
       f.kickoff_time AS kickoff_time,
       played.minutes AS minutes,
       played.goals_scored AS goals_scored,
@@ -73,10 +122,59 @@ def fetch_rows(tx):
       home.name AS home_team,
       away.name AS away_team
     """
-    result = tx.run(q)
+    result = tx.run(q, after_hash=after_hash, limit=limit)
     return [dict(r) for r in result]
 
 
+def read_batches(session, page_size=FETCH_PAGE_SIZE, batch_size=ENCODE_BATCH_SIZE):
+    """Yield (rows, texts, hashes) batches, reading one page at a time."""
+    after_hash = ""
+    while True:
+        page = session.execute_read(fetch_rows, after_hash, page_size)
+        if not page:
+            return
+        after_hash = page[-1]["row_hash"]
+        for start in range(0, len(page), batch_size):
+            rows = page[start : start + batch_size]
+            texts = [build_text_description(r) for r in rows]
+            yield rows, texts, [text_hash(t) for t in texts]
+
+
+# numeric fields described per fixture row
+NUMERIC_FIELDS = [
+    "total_points",
+    "goals_scored",
+    "assists",
+    "minutes",
+    "bonus",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bps",
+    "influence",
+    "creativity",
+    "threat",
+    "ict_index",
+    "form",
+]
+
+
+def _format_value(val):
+    # format float/truncation; None for missing values
+    if val is None:
+        return None
+    if isinstance(val, float):
+        if math.isnan(val):
+            return None
+        return f"{val:.2f}"
+    return str(val)
+
+
 def build_text_description(row):
     # Build a compact textual representation of the numeric features + context.
     # Only include values that are not None or NaN
@@ -88,145 +186,731 @@ def build_text_description(row):
         parts.append(f"Season: {row.get('season')}")
     if row.get("GW") is not None:
         parts.append(f"Gameweek: {row.get('GW')}")
-    # numeric fields
-    numeric_fields = [
-        "total_points",
-        "goals_scored",
-        "assists",
-        "minutes",
-        "bonus",
-        "clean_sheets",
-        "goals_conceded",
-        "own_goals",
-        "penalties_saved",
-        "penalties_missed",
-        "yellow_cards",
-        "red_cards",
-        "saves",
-        "bps",
-        "influence",
-        "creativity",
-        "threat",
-        "ict_index",
-        "form",
-    ]
-    for f in numeric_fields:
-        val = row.get(f)
-        if val is None:
-            continue
-        # format float/truncation
-        if isinstance(val, float):
-            if math.isnan(val):
-                continue
-            val_str = f"{val:.2f}"
-        else:
-            val_str = str(val)
-        parts.append(f"{f}: {val_str}")
+    for f in NUMERIC_FIELDS:
+        val_str = _format_value(row.get(f))
+        if val_str is not None:
+            parts.append(f"{f}: {val_str}")
     # teams
     if row.get("home_team") and row.get("away_team"):
         parts.append(f"Fixture: {row.get('home_team')} vs {row.get('away_team')}")
     return " | ".join(parts)
 
 
-def upsert_embedding_node(tx, source_node_id, source_label, model_tag, vector, text):
-    # Create Embedding node linked to source node (via relationship)
+def fetch_player_seasons(tx):
+    # One row per PlayerSeason node: its totals plus the fixtures it covers
+    q = """
+    MATCH (p:Player)-[:HAS_SEASON_STATS]->(ps:PlayerSeason)
+    MATCH (p)-[played:PLAYED_IN]->(f:Fixture)
+    WHERE played.season = ps.season
+    WITH p, ps, collect(f.fixture_number) AS fixtures
+    OPTIONAL MATCH (p)-[:PLAYS_AS]->(pos:Position)
+    OPTIONAL MATCH (p)-[:PLAYS_FOR {season: ps.season}]->(t:Team)
+    RETURN
+      id(ps) AS season_node_id,
+      p.player_name AS player_name,
+      p.player_element AS player_element,
+      coalesce(head(collect(DISTINCT pos.name)), '') AS position,
+      ps.season AS season,
+      collect(DISTINCT t.name) AS teams,
+      properties(ps) AS totals,
+      fixtures
+    """
+    result = tx.run(q)
+    return [dict(r) for r in result]
+
+
+def build_season_description(row):
+    # Summary document of one player-season, in the same shape as the
+    # fixture rows so "Player: X | Season: Y" queries land on it
+    totals = row["totals"]
+    parts = [f"Player: {row['player_name']}"]
+    if row.get("position"):
+        parts.append(f"Position: {row['position']}")
+    parts.append(f"Season: {row['season']}")
+    if row.get("teams"):
+        parts.append(f"Teams: {', '.join(row['teams'])}")
+    if totals.get("matches_played") is not None:
+        parts.append(f"Matches: {totals['matches_played']}")
+    # season sums; a sum of form (a rolling average) means nothing
+    for f in NUMERIC_FIELDS:
+        if f == "form":
+            continue
+        val_str = _format_value(totals.get(f"sum_{f}"))
+        if val_str is not None:
+            parts.append(f"{f}: {val_str}")
+    return " | ".join(parts)
+
+
+def embedding_key(model_tag, row):
+    """
+    Stable int64 id of one model's embedding of one player-fixture row. Used
+    as the Embedding node key and as the FAISS id, so it survives rebuilds.
+    """
+    key = f"{model_tag}:{row['player_name']}:{row['player_element']}:{row['season']}:{row['fixture']}"
+    digest = hashlib.sha1(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def normalize_rows(mat):
+    # normalize vectors for cosine similarity via inner product
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def create_embedding_constraint(tx):
+    tx.run(
+        "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Embedding) REQUIRE e.embedding_key IS UNIQUE"
+    )
+
+
+def create_row_hash_index(tx):
+    # Same index create_kg.py creates; fetch_rows pages on it
+    tx.run(
+        "CREATE INDEX played_in_row_hash IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.row_hash)"
+    )
+
+
+def count_unhashed_rows(tx):
+    # PLAYED_IN relationships written before the loader set row_hash
+    result = tx.run(
+        "MATCH ()-[r:PLAYED_IN]->() WHERE r.row_hash IS NULL RETURN count(r) AS n"
+    )
+    return result.single()["n"]
+
+
+def fetch_existing_embeddings(tx, model_tag):
+    # embedding_key -> (text_hash, embedding node id) for one model
+    q = """
+    MATCH (e:Embedding {model: $model})
+    WHERE e.embedding_key IS NOT NULL
+    RETURN e.embedding_key AS embedding_key, e.text_hash AS text_hash, id(e) AS node_id
+    """
+    result = tx.run(q, model=model_tag)
+    return {r["embedding_key"]: (r["text_hash"], r["node_id"]) for r in result}
+
+
+def fetch_vectors(tx, keys):
+    # Stored vectors of unchanged rows, to rebuild a FAISS index without re-encoding
+    q = """
+    UNWIND $keys AS key
+    MATCH (e:Embedding {embedding_key: key})
+    WHERE e.vector IS NOT NULL
+    RETURN e.embedding_key AS embedding_key, e.vector AS vector,
+           e.vector_dtype AS vector_dtype
+    """
+    result = tx.run(q, keys=keys)
+    return {
+        r["embedding_key"]: decode_vector(r["vector"], r["vector_dtype"])
+        for r in result
+    }
+
+
+def upsert_embedding_nodes(tx, rows, label):
+    # MERGE one Embedding node per row on its embedding_key, linked to its
+    # source node, in a single statement. `label` is the model label the
+    # Neo4j vector index covers. Returns {embedding_key: node id}.
+    q = f"""
+    UNWIND $rows AS row
+    MATCH (src) WHERE id(src) = row.source_node_id
+    MERGE (e:Embedding {{embedding_key: row.embedding_key}})
+    ON CREATE SET e.created_at = datetime()
+    SET e:{label},
+        e.model = row.model,
+        e.vector = row.vector,
+        e.vector_dtype = row.vector_dtype,
+        e.text = row.text,
+        e.text_hash = row.text_hash,
+        e.updated_at = datetime(),
+        e.source_label = row.source_label,
+        e.source_node_id = row.source_node_id
+    MERGE (src)-[:HAS_EMBEDDING]->(e)
+    RETURN row.embedding_key AS embedding_key, id(e) AS embedding_node_id
+    """
+    result = tx.run(q, rows=rows)
+    return {r["embedding_key"]: r["embedding_node_id"] for r in result}
+
+
+def strip_node_vectors(tx, model_tag, limit=WRITE_BATCH_SIZE):
+    # Vectors live in the sidecar: drop the node copies, one batch per call
     q = """
-    MATCH (src) WHERE id(src) = $source_node_id
-    CREATE (e:Embedding {
-      model: $model,
-      vector: $vector,
-      text: $text,
-      created_at: datetime(),
-      source_label: $source_label,
-      source_node_id: $source_node_id
-    })
-    CREATE (src)-[:HAS_EMBEDDING]->(e)
-    RETURN id(e) AS embedding_node_id
-    """
-    res = tx.run(
-        q,
+    MATCH (e:Embedding {model: $model})
+    WHERE e.vector IS NOT NULL
+    WITH e LIMIT $limit
+    REMOVE e.vector, e.vector_dtype
+    RETURN count(e) AS stripped
+    """
+    return tx.run(q, model=model_tag, limit=limit).single()["stripped"]
+
+
+def delete_embedding_nodes(tx, model_tag, keys):
+    # Superseded rows, plus legacy nodes written before embedding_key existed
+    tx.run(
+        """
+        UNWIND $keys AS key
+        MATCH (e:Embedding {embedding_key: key})
+        DETACH DELETE e
+        """,
+        keys=keys,
+    )
+    tx.run(
+        """
+        MATCH (e:Embedding {model: $model})
+        WHERE e.embedding_key IS NULL
+        DETACH DELETE e
+        """,
         model=model_tag,
-        vector=list(map(float, vector)),
-        text=text,
-        source_label=source_label,
-        source_node_id=source_node_id,
     )
-    rec = res.single()
-    return rec["embedding_node_id"]
 
 
-def main():
-    with driver.session() as session:
-        rows = session.read_transaction(fetch_rows)
-        print(f"Fetched {len(rows)} rows from Neo4j.")
-
-        texts = []
-        source_infos = []  # keep (source_node_id, source_label)
-        for r in rows:
-            text = build_text_description(r)
-            texts.append(text)
-            # we set source_label to "Player" here (you can generalize)
-            source_infos.append((int(r["player_id"]), "Player"))
-
-        # encode with both models
-        print("Encoding with model A:", MODEL_A_NAME)
-        emb_a = model_a.encode(texts, convert_to_numpy=True, show_progress_bar=True)
-        print("Encoding with model B:", MODEL_B_NAME)
-        emb_b = model_b.encode(texts, convert_to_numpy=True, show_progress_bar=True)
-
-        # Build FAISS indexes
-        dim_a = emb_a.shape[1]
-        dim_b = emb_b.shape[1]
-        print("Model A dim:", dim_a, "Model B dim:", dim_b)
-
-        index_a = faiss.IndexFlatIP(
-            dim_a
-        )  # use inner-product on normalized vectors (will normalize below)
-        index_b = faiss.IndexFlatIP(dim_b)
-
-        # normalize vectors for cosine similarity via inner product
-        def normalize_rows(mat):
-            norms = np.linalg.norm(mat, axis=1, keepdims=True)
-            norms[norms == 0] = 1.0
-            return mat / norms
-
-        emb_a_norm = normalize_rows(emb_a)
-        emb_b_norm = normalize_rows(emb_b)
-
-        # add to indexes and keep mapping
-        index_a.add(emb_a_norm.astype("float32"))
-        index_b.add(emb_b_norm.astype("float32"))
-
-        # save indexes
-        faiss.write_index(index_a, FAISS_INDEX_A_PATH)
-        faiss.write_index(index_b, FAISS_INDEX_B_PATH)
-        print("Saved FAISS indexes to disk.")
-
-        # Persist Embedding nodes in Neo4j (we will create one embedding node per model per source)
-        idx_to_embedding_id_a = {}
-        idx_to_embedding_id_b = {}
-
-        # iterate and create embedding nodes
-        for i, (src_id, src_label) in enumerate(source_infos):
-            text = texts[i]
-            vector_a = emb_a_norm[i].tolist()
-            vector_b = emb_b_norm[i].tolist()
-            emb_node_id_a = session.write_transaction(
-                upsert_embedding_node, src_id, src_label, "modelA", vector_a, text
+def write_embeddings(
+    session,
+    model_tag,
+    vectors,
+    items,
+    batch_size=WRITE_BATCH_SIZE,
+    vector_dtype="float32",
+):
+    """
+    Write all vectors of one model in UNWIND batches.
+    items: one dict per vector with embedding_key, text, text_hash,
+    source_node_id and source_label. vector_dtype: how the vector property
+    is stored (float32 list, or float16/int8 packed bytes); None stores no
+    vector (sidecar mode).
+    Returns embedding_key -> node id.
+    """
+    key_to_embedding_id = {}
+    for start in range(0, len(items), batch_size):
+        end = min(start + batch_size, len(items))
+        rows = [
+            dict(item, model=model_tag, vector=vector, vector_dtype=vector_dtype)
+            for item, vector in zip(
+                items[start:end],
+                (
+                    encode_vectors(vectors[start:end], vector_dtype)
+                    if vector_dtype
+                    else [None] * (end - start)
+                ),
+            )
+        ]
+        key_to_embedding_id.update(
+            session.execute_write(upsert_embedding_nodes, rows, MODEL_LABELS[model_tag])
+        )
+    return key_to_embedding_id
+
+
+def build_season_index(model_tag, model, seasons):
+    """
+    Coarse index for two-stage search: one vector per player-season summary,
+    keyed by PlayerSeason node id, plus the [node id, embedding_key] pairs
+    of the fixture rows each one covers. There are a few thousand
+    player-seasons, so this is rebuilt on every run.
+    """
+    emb = model.encode(
+        [build_season_description(r) for r in seasons],
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    vectors = normalize_rows(emb).astype("float32")
+    ids = np.array([r["season_node_id"] for r in seasons], dtype="int64")
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+    index.add_with_ids(vectors, ids)
+
+    members = [
+        (r["season_node_id"], embedding_key(model_tag, dict(r, fixture=fixture)))
+        for r in seasons
+        for fixture in r["fixtures"]
+    ]
+    return index, members
+
+
+def ensure_vector_index(session, model_tag, dim):
+    """
+    Label the model's Embedding nodes written before model labels existed,
+    then create its Neo4j vector index. Neo4j populates the index in the
+    background; the printed state shows how far it got.
+    """
+    labelled = 0
+    while True:
+        n = session.execute_write(label_embedding_nodes, model_tag)
+        if not n:
+            break
+        labelled += n
+    session.execute_write(create_vector_index, model_tag, dim)
+    state = session.execute_read(fetch_vector_index_state, model_tag)
+    print(
+        f"{model_tag}: Neo4j vector index {state[0] if state else 'missing'} "
+        f"({state[1] if state else 0:.0f}% populated), labelled {labelled} nodes"
+    )
+
+
+def ann_index_path(model_tag, index_type):
+    # e.g. embeddings_out/faiss_index_modelA_hnsw.index
+    root, ext = os.path.splitext(FAISS_INDEX_PATHS[model_tag])
+    return f"{root}_{index_type}{ext}"
+
+
+def load_id_index(path, dim):
+    """Existing FAISS index keyed by embedding_key, or None if it must be rebuilt."""
+    if not os.path.exists(path):
+        return None
+    index = faiss.read_index(path)
+    # Indexes from before embedding keys are positional and cannot be patched
+    if not isinstance(index, faiss.IndexIDMap2) or index.d != dim:
+        return None
+    return index
+
+
+class ModelIndex:
+    """
+    One model's side of a run: its FAISS index, the Embedding nodes it
+    already has, and the embedding_key -> node id mapping and metadata
+    columns built so far.
+    Incremental runs patch the saved index in place when it is keyed by
+    embedding_key; otherwise the index is rebuilt batch by batch, reusing
+    the stored vectors of unchanged rows (from the sidecar files when
+    present, else from their Embedding nodes).
+    """
+
+    def __init__(self, session, model_tag, model, incremental):
+        self.model_tag = model_tag
+        self.model = model
+        self.incremental = incremental
+        self.dim = model.get_sentence_embedding_dimension()
+        self.existing = session.execute_read(fetch_existing_embeddings, model_tag)
+
+        index = load_id_index(FAISS_INDEX_PATHS[model_tag], self.dim)
+        self.patch = incremental and index is not None
+        if not self.patch:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+        self.index = index
+        self.sidecar = SidecarVectors.open(OUTPUT_DIR, model_tag)
+
+        self.seen = set()
+        self.mapping = {}
+        self.metadata = []
+        self.encoded = 0
+        self.encode_seconds = 0.0
+
+    def encode_batch(self, session, rows, texts, hashes):
+        """
+        Encode the rows of one batch that need it and add them to the index.
+        Returns the Embedding node rows to write (with their vectors), or None.
+        """
+        keys = [embedding_key(self.model_tag, r) for r in rows]
+        self.seen.update(keys)
+        self.metadata.extend(
+            (
+                k,
+                r["player_name"],
+                r["player_element"],
+                r["season"],
+                r["position"],
+                r["GW"],
+            )
+            for k, r in zip(keys, rows)
+        )
+
+        if self.incremental:
+            todo = [
+                i
+                for i, k in enumerate(keys)
+                if self.existing.get(k, (None,))[0] != hashes[i]
+            ]
+        else:
+            todo = list(range(len(rows)))
+
+        todo_set = set(todo)
+        unchanged = [i for i in range(len(keys)) if i not in todo_set]
+        if unchanged and not self.patch:
+            found, stored = self.stored_vectors(session, [keys[i] for i in unchanged])
+            # Rows whose vector is stored nowhere (e.g. deleted sidecar) are re-encoded
+            todo = sorted(todo + [i for i, ok in zip(unchanged, found) if not ok])
+            unchanged = [i for i, ok in zip(unchanged, found) if ok]
+            if unchanged:
+                self.index.add_with_ids(
+                    stored[found], np.array([keys[i] for i in unchanged], dtype="int64")
+                )
+        for i in unchanged:
+            self.mapping[keys[i]] = self.existing[keys[i]][1]
+
+        if not todo:
+            return None
+
+        start = time.perf_counter()
+        emb = self.model.encode(
+            [texts[i] for i in todo], convert_to_numpy=True, show_progress_bar=False
+        )
+        self.encode_seconds += time.perf_counter() - start
+        vectors = normalize_rows(emb).astype("float32")
+        todo_keys = np.array([keys[i] for i in todo], dtype="int64")
+        if self.patch:
+            self.index.remove_ids(todo_keys)
+        self.index.add_with_ids(vectors, todo_keys)
+        self.encoded += len(todo)
+
+        items = [
+            {
+                "embedding_key": keys[i],
+                "text": texts[i],
+                "text_hash": hashes[i],
+                # we set source_label to "Player" here (you can generalize)
+                "source_label": "Player",
+                "source_node_id": int(rows[i]["player_id"]),
+            }
+            for i in todo
+        ]
+        return items, vectors
+
+    def stored_vectors(self, session, keys):
+        """
+        (found mask, vectors) for keys: sidecar rows first (a local read),
+        Embedding node properties for the rest.
+        """
+        vectors = np.zeros((len(keys), self.dim), dtype="float32")
+        found = np.zeros(len(keys), dtype=bool)
+        if self.sidecar is not None:
+            found = self.sidecar.rows(keys) >= 0
+            if found.any():
+                vectors[found] = self.sidecar.get(np.asarray(keys)[found])
+        if not found.all():
+            missing = [k for k, ok in zip(keys, found) if not ok]
+            stored = session.execute_read(fetch_vectors, missing)
+            for i, k in enumerate(keys):
+                if not found[i] and k in stored:
+                    vectors[i] = stored[k]
+                    found[i] = True
+        return found, vectors
+
+    def finish(self, session, written):
+        """Delete superseded embeddings and merge in the written node ids."""
+        stale = list(set(self.existing) - self.seen)
+        for start in range(0, len(stale), WRITE_BATCH_SIZE):
+            batch = stale[start : start + WRITE_BATCH_SIZE]
+            session.execute_write(delete_embedding_nodes, self.model_tag, batch)
+        if stale and self.patch:
+            self.index.remove_ids(np.array(stale, dtype="int64"))
+
+        # Mapping: FAISS id (embedding_key) -> Embedding node id
+        self.mapping.update(written)
+        print(
+            f"{self.model_tag}: {self.encoded} encoded, "
+            f"{len(self.seen) - self.encoded} unchanged, {len(stale)} superseded"
+        )
+        if self.encode_seconds:
+            print(
+                f"{self.model_tag}: {self.encoded / self.encode_seconds:.0f} texts/sec "
+                f"({self.encode_seconds:.1f}s encoding)"
             )
-            emb_node_id_b = session.write_transaction(
-                upsert_embedding_node, src_id, src_label, "modelB", vector_b, text
+
+
+_DONE = object()
+
+
+def _put(q, item, stop):
+    # Blocks while the queue is full, unless another stage has failed
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while True:
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+
+def _start_stage(target, stop, errors):
+    def run():
+        try:
+            target()
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def run_pipeline(
+    session,
+    models,
+    batch_size=ENCODE_BATCH_SIZE,
+    queue_size=QUEUE_SIZE,
+    vector_dtype="float32",
+):
+    """
+    Stream rows through read -> encode -> write:
+    - a reader thread pages rows out of Neo4j and builds their descriptions
+    - this thread encodes each batch with every model and appends it to the
+      FAISS indexes
+    - a writer thread upserts the Embedding nodes
+    Bounded queues connect the stages, so only a few batches are in memory
+    at once and reading, encoding and writing overlap.
+    Returns {model_tag: embedding_key -> node id} for the written nodes.
+    """
+    stop = threading.Event()
+    errors = []
+    row_q = queue.Queue(maxsize=queue_size)
+    write_q = queue.Queue(maxsize=queue_size)
+    written = {model_tag: {} for model_tag in models}
+
+    def reader():
+        # Neo4j sessions are not thread-safe: each stage opens its own
+        try:
+            with driver.session() as read_session:
+                for batch in read_batches(read_session, batch_size=batch_size):
+                    if not _put(row_q, batch, stop):
+                        return
+        finally:
+            _put(row_q, _DONE, stop)
+
+    def writer():
+        with driver.session() as write_session:
+            while True:
+                job = _get(write_q, stop)
+                if job is _DONE:
+                    return
+                model_tag, items, vectors = job
+                written[model_tag].update(
+                    write_embeddings(
+                        write_session,
+                        model_tag,
+                        vectors,
+                        items,
+                        vector_dtype=vector_dtype,
+                    )
+                )
+
+    threads = [_start_stage(reader, stop, errors), _start_stage(writer, stop, errors)]
+    done = 0
+    try:
+        while True:
+            batch = _get(row_q, stop)
+            if batch is _DONE:
+                break
+            for model_tag, state in models.items():
+                job = state.encode_batch(session, *batch)
+                if job is not None:
+                    _put(write_q, (model_tag, *job), stop)
+            done += len(batch[0])
+            print(f"Processed {done} rows")
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        _put(write_q, _DONE, stop)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Embed player-fixture rows and build the FAISS indexes."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only encode rows whose description changed since the last run",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=ENCODE_BATCH_SIZE,
+        help=f"Rows per encode batch (default {ENCODE_BATCH_SIZE}); "
+        "raise it with --workers so every worker gets chunks",
+    )
+    add_pool_args(parser)
+    parser.add_argument(
+        "--index-type",
+        choices=INDEX_TYPES,
+        default="flat",
+        help="Also build this approximate or quantized index from the flat one "
+        "(default: flat only)",
+    )
+    parser.add_argument("--nlist", type=int, default=None, help="IVF cells")
+    parser.add_argument(
+        "--pq-m", type=int, default=None, help="PQ sub-quantizers (default d/8)"
+    )
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW graph degree")
+    parser.add_argument(
+        "--ef-construction", type=int, default=200, help="HNSW build breadth"
+    )
+    parser.add_argument(
+        "--vector-dtype",
+        choices=VECTOR_DTYPES,
+        default="float32",
+        help="Storage dtype of persisted vectors, on Embedding nodes or in the "
+        "sidecar (float16/int8 are packed bytes on nodes)",
+    )
+    for tag in ("a", "b"):
+        parser.add_argument(
+            f"--encoder-backend-{tag}",
+            choices=ENCODER_BACKENDS,
+            default="torch",
+            help=f"Encoder backend for model {tag.upper()} (modules/encoders.py)",
+        )
+    parser.add_argument(
+        "--vector-store",
+        choices=["neo4j", "sidecar"],
+        default="neo4j",
+        help="Keep raw vectors on Embedding nodes, or in memory-mapped .npy "
+        "files next to the FAISS index (nodes keep text, model and key only)",
+    )
+    parser.add_argument(
+        "--vector-index",
+        action="store_true",
+        help="Also create Neo4j vector indexes over the Embedding node vectors "
+        "(for VECTOR_BACKEND=neo4j)",
+    )
+    args = parser.parse_args()
+    if args.vector_index and (
+        args.vector_store != "neo4j" or args.vector_dtype != "float32"
+    ):
+        parser.error(
+            "--vector-index needs float32 vectors on Embedding nodes "
+            "(--vector-store neo4j --vector-dtype float32)"
+        )
+    return args
+
+
+def load_models(backends, pool=None):
+    """
+    Encoders by model tag on their backends (see modules/encoders.py):
+    in-process, or handles on the worker pool. Loaded here rather than at
+    import so spawned workers do not each load both models when they import
+    this module.
+    """
+    if pool is not None:
+        return {
+            tag: pool.encoder(name, backends[tag]) for tag, name in MODEL_NAMES.items()
+        }
+    return {tag: load_encoder(name, backends[tag]) for tag, name in MODEL_NAMES.items()}
+
+
+def main():
+    args = parse_args()
+    backends = {"modelA": args.encoder_backend_a, "modelB": args.encoder_backend_b}
+
+    pool = None
+    if args.workers:
+        pool = EncodingPool(args.workers, args.threads_per_worker, args.chunk_size)
+        print(
+            f"Encoding with {pool.workers} workers x "
+            f"{pool.threads_per_worker} torch threads"
+        )
+
+    try:
+        with driver.session() as session:
+            session.execute_write(create_embedding_constraint)
+            session.execute_write(create_row_hash_index)
+            unhashed = session.execute_read(count_unhashed_rows)
+            if unhashed:
+                raise SystemExit(
+                    f"{unhashed} PLAYED_IN relationships have no row_hash; "
+                    "rerun scripts/create_kg.py before generating embeddings"
+                )
+
+            models = {
+                model_tag: ModelIndex(session, model_tag, model, args.incremental)
+                for model_tag, model in load_models(backends, pool).items()
+            }
+            for model_tag in models:
+                print(f"Encoding with {model_tag}:", MODEL_NAMES[model_tag])
+
+            written = run_pipeline(
+                session,
+                models,
+                batch_size=args.batch_size,
+                vector_dtype=(
+                    args.vector_dtype if args.vector_store == "neo4j" else None
+                ),
             )
-            idx_to_embedding_id_a[i] = int(emb_node_id_a)
-            idx_to_embedding_id_b[i] = int(emb_node_id_b)
 
-        # Save mappings
-        with open(MAPPING_A_PATH, "w") as f:
-            json.dump(idx_to_embedding_id_a, f)
-        with open(MAPPING_B_PATH, "w") as f:
-            json.dump(idx_to_embedding_id_b, f)
+            seasons = session.execute_read(fetch_player_seasons)
+            if not seasons:
+                print(
+                    "No PlayerSeason nodes (run create_kg.py first); "
+                    "skipping the player-season index"
+                )
+
+            for model_tag, state in models.items():
+                state.finish(session, written[model_tag])
+                print(f"{model_tag} dim: {state.dim}, vectors: {state.index.ntotal}")
+
+                # The flat index stays the source of truth for incremental runs
+                faiss.write_index(state.index, FAISS_INDEX_PATHS[model_tag])
+                write_mapping(MAPPING_PATHS[model_tag], state.mapping)
+                # Filter columns for vector_search, one row per index vector
+                write_metadata(OUTPUT_DIR, model_tag, state.metadata)
+
+                if args.vector_store == "sidecar":
+                    path = write_sidecar(
+                        state.index, OUTPUT_DIR, model_tag, args.vector_dtype
+                    )
+                    # Nodes written before the switch still carry a copy
+                    stripped = 0
+                    while True:
+                        n = session.execute_write(strip_node_vectors, model_tag)
+                        if not n:
+                            break
+                        stripped += n
+                    print(
+                        f"{model_tag}: wrote sidecar {path}, "
+                        f"stripped vectors from {stripped} nodes"
+                    )
+
+                if args.vector_index:
+                    ensure_vector_index(session, model_tag, state.dim)
+
+                if seasons:
+                    season_index, members = build_season_index(
+                        model_tag, state.model, seasons
+                    )
+                    index_path, members_path = season_index_paths(OUTPUT_DIR, model_tag)
+                    faiss.write_index(season_index, index_path)
+                    write_groups(members_path, members)
+                    print(
+                        f"{model_tag}: player-season index, "
+                        f"{season_index.ntotal} seasons over {len(members)} rows"
+                    )
+
+                if args.index_type != "flat":
+                    start = time.perf_counter()
+                    ann = build_index(
+                        args.index_type,
+                        *flat_contents(state.index),
+                        nlist=args.nlist,
+                        pq_m=args.pq_m,
+                        hnsw_m=args.hnsw_m,
+                        ef_construction=args.ef_construction,
+                    )
+                    path = ann_index_path(model_tag, args.index_type)
+                    faiss.write_index(ann, path)
+                    print(
+                        f"{model_tag}: built {args.index_type} index in "
+                        f"{time.perf_counter() - start:.1f}s -> {path}"
+                    )
 
-        print("Saved mapping files to disk.")
+            print("Saved FAISS indexes and mapping files to disk.")
+    finally:
+        if pool is not None:
+            pool.close()
 
 
 if __name__ == "__main__":
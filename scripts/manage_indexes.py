@@ -0,0 +1,259 @@
+# scripts/manage_indexes.py
+
+import argparse
+import os
+import re
+import sys
+from neo4j import GraphDatabase
+
+# Allow `from config...` when run as `python manage_indexes.py` from scripts/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.template_library import CYPHER_TEMPLATE_LIBRARY  # noqa: E402
+
+# Values used to render and EXPLAIN every template. Only their types matter
+# to the planner; the templates are never executed.
+SAMPLE_PARAMS = {
+    "player1": "Mohamed Salah",
+    "player2": "Harry Kane",
+    "team1": "Arsenal",
+    "team2": "Chelsea",
+    "position": "MID",
+    "gw": 1,
+    "season": "2022-23",
+    "stat_property": "total_points",
+    "limit": 5,
+}
+
+# Plan operators that mean a template still reads a whole label or type
+SCAN_OPERATORS = {
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "UnionNodeByLabelsScan",
+    "IntersectionNodeByLabelsScan",
+    "DirectedAllRelationshipsScan",
+    "UndirectedAllRelationshipsScan",
+    "DirectedRelationshipTypeScan",
+    "UndirectedRelationshipTypeScan",
+}
+
+_NODE_PATTERN = re.compile(r"\((\w*)\s*:\s*(\w+)\s*(\{[^}]*\})?\s*\)")
+_REL_PATTERN = re.compile(r"\[(\w*)\s*:\s*([\w|]+)\s*(\{[^}]*\})?[^\]]*\]")
+_MAP_KEY = re.compile(r"(\w+)\s*:")
+_WHERE_CLAUSE = re.compile(
+    r"\bWHERE\b(.*?)(?=\b(?:RETURN|WITH|MATCH|OPTIONAL|ORDER|UNWIND|CALL|SKIP|LIMIT)\b|$)",
+    re.DOTALL,
+)
+# var.prop compared against a parameter or a number literal
+_PREDICATE = re.compile(
+    r"\b(\w+)\.(\w+)\s*(?:=|<>|<=|>=|<|>|\bIN\b|STARTS WITH|ENDS WITH|CONTAINS)\s*(\$\w+|-?\d)"
+)
+
+
+def render_template(template, params=SAMPLE_PARAMS):
+    # Same injection as cypher_retriever.render_cypher_template
+    for key in ["stat_property", "limit"]:
+        if key in params and f"${key}" in template:
+            template = template.replace(f"${key}", str(params[key]))
+    return template
+
+
+def _scan_template(template):
+    """(requirement, anchored) pairs; anchored filters compare to a parameter."""
+    cypher = render_template(template)
+    variables = {}
+    filters = []
+
+    for entity_type, pattern in (
+        ("NODE", _NODE_PATTERN),
+        ("RELATIONSHIP", _REL_PATTERN),
+    ):
+        for var, label, props in pattern.findall(cypher):
+            if "|" in label:
+                continue
+            if var:
+                variables[var] = (entity_type, label)
+            keys = tuple(_MAP_KEY.findall(props))
+            if keys:
+                filters.append(((entity_type, label, keys), "$" in props))
+
+    for clause in _WHERE_CLAUSE.findall(cypher):
+        for var, prop, value in _PREDICATE.findall(clause):
+            if var in variables:
+                entity_type, label = variables[var]
+                filters.append(((entity_type, label, (prop,)), value.startswith("$")))
+
+    return filters
+
+
+def template_filters(template):
+    """
+    Index requirements of one template as (entity_type, label, properties).
+    Inline property maps become one (possibly composite) index; WHERE
+    predicates against a parameter or literal become single-property ones.
+    """
+    return list(dict.fromkeys(req for req, _ in _scan_template(template)))
+
+
+def is_anchored(template):
+    """True if the template looks something up by a parameter value."""
+    return any(anchored for _, anchored in _scan_template(template))
+
+
+def required_indexes(library=CYPHER_TEMPLATE_LIBRARY):
+    """Map every index requirement to the templates that need it."""
+    required = {}
+    for name, template in library.items():
+        for requirement in template_filters(template):
+            required.setdefault(requirement, []).append(name)
+    return required
+
+
+def index_name(entity_type, label, properties):
+    prefix = "idx" if entity_type == "NODE" else "rel_idx"
+    return "_".join([prefix, label.lower()] + [p.lower() for p in properties])
+
+
+def fetch_existing_indexes(tx):
+    # Range indexes, including the ones backing uniqueness constraints
+    result = tx.run(
+        """
+        SHOW INDEXES YIELD type, entityType, labelsOrTypes, properties
+        WHERE type = 'RANGE'
+        RETURN entityType, labelsOrTypes, properties
+        """
+    )
+    return {
+        (r["entityType"], r["labelsOrTypes"][0], tuple(r["properties"])) for r in result
+    }
+
+
+def create_index(tx, entity_type, label, properties):
+    name = index_name(entity_type, label, properties)
+    if entity_type == "NODE":
+        pattern = f"(n:{label})"
+    else:
+        pattern = f"()-[n:{label}]-()"
+    on = ", ".join(f"n.{p}" for p in properties)
+    tx.run(f"CREATE INDEX {name} IF NOT EXISTS FOR {pattern} ON ({on})")
+
+
+def sync_indexes(session, library=CYPHER_TEMPLATE_LIBRARY):
+    """Create every index the templates need that does not exist yet."""
+    existing = session.execute_read(fetch_existing_indexes)
+    created = []
+    for requirement, templates in required_indexes(library).items():
+        if requirement in existing:
+            continue
+        session.execute_write(create_index, *requirement)
+        created.append(requirement)
+        entity_type, label, properties = requirement
+        print(
+            f"Created {index_name(*requirement)} on {label}({', '.join(properties)}) "
+            f"for {len(templates)} template(s)"
+        )
+    if created:
+        # New indexes populate in the background; plans only use them once online
+        session.run("CALL db.awaitIndexes(300)").consume()
+    return created
+
+
+def plan_operators(plan):
+    """All operator names in a plan tree, without the runtime suffix (@neo4j)."""
+    operators = [plan["operatorType"].split("@")[0]]
+    for child in plan.get("children", []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+def explain_template(session, template):
+    cypher = render_template(template)
+    params = {
+        k: v for k, v in SAMPLE_PARAMS.items() if k not in ("stat_property", "limit")
+    }
+    summary = session.run("EXPLAIN " + cypher, params).consume()
+    return plan_operators(summary.plan)
+
+
+def verify_plans(session, library=CYPHER_TEMPLATE_LIBRARY):
+    """
+    EXPLAIN every template and return {template: [scan operators]} for the
+    ones that still scan. Templates that never look anything up by a
+    parameter (league-wide leaderboards) have to read every node and are
+    not checked.
+    """
+    failures = {}
+    for name, template in library.items():
+        if not is_anchored(template):
+            continue
+        scans = [
+            op for op in explain_template(session, template) if op in SCAN_OPERATORS
+        ]
+        if scans:
+            failures[name] = scans
+    return failures
+
+
+def run(session, verify=True):
+    """Sync indexes, then verify plans. Returns the failing templates."""
+    print("Syncing template indexes...")
+    created = sync_indexes(session)
+    print(f"{len(created)} index(es) created.")
+    if not verify:
+        return {}
+
+    print("Checking template plans...")
+    failures = verify_plans(session)
+    for name, scans in failures.items():
+        print(f"  {name}: {', '.join(sorted(set(scans)))}")
+    if failures:
+        print(f"{len(failures)} template(s) still scan a label or relationship type.")
+    else:
+        print("All filtered templates use index seeks.")
+    return failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Create the indexes the Cypher templates need and check their plans."
+    )
+    parser.add_argument("--config", default="config.txt", help="Neo4j config file")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print the indexes derived from the template library",
+    )
+    parser.add_argument(
+        "--no-verify", action="store_true", help="Skip the EXPLAIN plan check"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.dry_run:
+        for (entity_type, label, properties), templates in required_indexes().items():
+            print(
+                f"{entity_type} {label}({', '.join(properties)}): {', '.join(templates)}"
+            )
+        return
+
+    from create_kg import read_config
+
+    config = read_config(args.config)
+    uri = config.get("URI", "neo4j://localhost:7687")
+    username = config.get("USERNAME", "neo4j")
+    password = config.get("PASSWORD", "password")
+
+    driver = GraphDatabase.driver(uri, auth=(username, password))
+    with driver.session() as session:
+        failures = run(session, verify=not args.no_verify)
+    driver.close()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Parity check between the Cypher and DuckDB retrieval backends
+Runs every intent that has a SQL template against both and compares rows,
+then every leaderboard with more statistics, and checks that stats missing
+from the facts table are routed to Cypher by retrieve_data.
+Needs a populated Neo4j graph and the DuckDB facts store
+(scripts/create_facts_db.py) built from the same CSV.
+"""
+
+import time
+
+from config.sql_template_library import SQL_TEMPLATE_LIBRARY
+from modules import duckdb_retriever
+from modules.cypher_retriever import retrieve_data, retrieve_data_via_cypher
+from modules.duckdb_retriever import (
+    execute_sql,
+    fact_columns,
+    retrieve_data_via_duckdb,
+    supports,
+)
+
+# Leaderboards (templates with $limit) are also checked with these stats
+LEADERBOARD_STATS = ["assists", "minutes", "bonus"]
+
+# Graph stats that are not columns of the facts table
+UNKNOWN_STATS = ["value", "transfers_in"]
+
+
+def sample_entities():
+    """Real players/teams/positions from the facts store so results are non-empty"""
+    top = execute_sql(
+        """
+        SELECT player_name,
+               first(position) AS position,
+               first(season) AS season,
+               first(opponent) AS opponent
+        FROM player_fixtures
+        GROUP BY player_name
+        ORDER BY sum(total_points) DESC, player_name
+        LIMIT 2
+        """,
+        {},
+    )
+    first, second = top[0], top[1]
+    return {
+        "players": [first["player_name"], second["player_name"]],
+        "teams": [first["opponent"]],
+        "positions": [first["position"]],
+        "seasons": [first["season"]],
+        "statistics": ["goals_scored"],
+        "gameweeks": [1],
+    }
+
+
+def normalize(rows):
+    """Rows as sorted tuples; floats rounded so both engines compare equal"""
+    out = []
+    for row in rows:
+        values = []
+        for key in sorted(row):
+            value = row[key]
+            if isinstance(value, float):
+                value = round(value, 6)
+            values.append((key, value))
+        out.append(tuple(values))
+    return sorted(out, key=repr)
+
+
+def numeric_only(rows):
+    """Drop names: leaderboards with ties at the cut-off may pick different players"""
+    return normalize(
+        [{k: v for k, v in row.items() if not isinstance(v, str)} for row in rows]
+    )
+
+
+def test_intent(intent, entities, limit=5):
+    start = time.perf_counter()
+    graph = retrieve_data_via_cypher(intent, entities, limit=limit)
+    graph_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    sql = retrieve_data_via_duckdb(intent, entities, limit=limit)
+    sql_ms = (time.perf_counter() - start) * 1000
+
+    if graph.get("error") or sql.get("error"):
+        status = "ERROR"
+    elif normalize(graph["results"]) == normalize(sql["results"]):
+        status = "PASS"
+    elif "LIMIT" in sql["cypher_query"] and numeric_only(
+        graph["results"]
+    ) == numeric_only(sql["results"]):
+        status = "PASS (ties)"
+    else:
+        status = "FAIL"
+
+    print(
+        f"{status:12} {intent:55} cypher {graph_ms:8.1f} ms   duckdb {sql_ms:8.1f} ms"
+    )
+    if status in ("FAIL", "ERROR"):
+        print(f"  cypher: {graph.get('error') or graph['results']}")
+        print(f"  duckdb: {sql.get('error') or sql['results']}")
+    return status
+
+
+def test_unknown_stat(intent, entities, stat):
+    """retrieve_data must answer from Cypher, not raise, for a stat DuckDB lacks"""
+    entities = dict(entities, statistics=[stat])
+    try:
+        routed = retrieve_data(intent, entities)
+        graph = retrieve_data_via_cypher(intent, entities)
+    except Exception as e:
+        print(f"{'ERROR':12} {intent:55} {stat}: {e!r}")
+        return "ERROR"
+    ok = (
+        stat not in fact_columns()
+        and not supports(intent, entities)
+        and normalize(routed["results"]) == normalize(graph["results"])
+    )
+    status = "PASS" if ok else "FAIL"
+    print(f"{status:12} {intent:55} {stat} routed to Cypher")
+    return status
+
+
+def run_tests():
+    """Run every SQL-backed intent on both backends"""
+    # DuckDB is opt-in; the routing checks need retrieve_data to consider it
+    duckdb_retriever.ANALYTICS_BACKEND = "duckdb"
+    entities = sample_entities()
+    print(f"Entities: {entities}\n")
+
+    statuses = [test_intent(intent, entities) for intent in SQL_TEMPLATE_LIBRARY]
+
+    # Fixed-stat leaderboards already ran above; stat leaderboards get more stats
+    print("\nLeaderboards")
+    for intent, sql in SQL_TEMPLATE_LIBRARY.items():
+        if "$limit" not in sql or "$stat_property" not in sql:
+            continue
+        for stat in LEADERBOARD_STATS:
+            statuses.append(
+                test_intent(intent, dict(entities, statistics=[stat]), limit=10)
+            )
+
+    print("\nStats missing from the facts table")
+    for intent, sql in SQL_TEMPLATE_LIBRARY.items():
+        if "$stat_property" in sql:
+            for stat in UNKNOWN_STATS:
+                statuses.append(test_unknown_stat(intent, entities, stat))
+
+    failed = sum(status in ("FAIL", "ERROR") for status in statuses)
+    print(f"\n{len(statuses) - failed}/{len(statuses)} intents match")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if run_tests() else 0)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Parity check between the PyTorch and ONNX Runtime encoder backends
+Encodes the same texts with SentenceTransformer and with each ONNX backend
+(modules/encoders.py), and compares per-text cosine similarity. Also prints
+single-query encode latency, the case vector_search pays on every request.
+Needs torch, transformers, sentence-transformers and onnxruntime.
+"""
+
+import time
+
+import numpy as np
+
+from modules.encoders import load_encoder
+
+MODELS = [
+    "sentence-transformers/all-MiniLM-L6-v2",
+    "sentence-transformers/all-mpnet-base-v2",
+]
+
+# Minimum per-text cosine similarity to the PyTorch embedding
+THRESHOLDS = {"onnx": 0.999, "onnx-int8": 0.97}
+
+TEXTS = [
+    # Query texts as vector_retriever builds them
+    "Players: Mohamed Salah | Seasons: 2022-23",
+    "Players: Erling Haaland, Harry Kane | Statistics: goals_scored",
+    "Teams: Arsenal | Positions: DEF | Gameweeks: 10",
+    "General football query",
+    # Corpus texts as generate_embeddings builds them
+    "Player: Mohamed Salah | Position: MID | Season: 2022-23 | Gameweek: 10 | "
+    "total_points: 15 | goals_scored: 1 | assists: 0 | minutes: 90 | bonus: 2 | "
+    "clean_sheets: 0 | ict_index: 45.30 | Fixture: Arsenal vs Liverpool",
+    "Player: Nick Pope | Position: GK | Season: 2021-22 | Gameweek: 3 | "
+    "total_points: 6 | saves: 5 | clean_sheets: 1 | minutes: 90",
+]
+
+
+def single_query_ms(encoder, runs=20):
+    encoder.encode([TEXTS[0]])  # warm-up
+    start = time.perf_counter()
+    for _ in range(runs):
+        encoder.encode([TEXTS[0]])
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def test_model(model_name):
+    reference = load_encoder(model_name, "torch")
+    expected = reference.encode(TEXTS, convert_to_numpy=True)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    print(f"{model_name}\n  torch      {single_query_ms(reference):7.2f} ms/query")
+
+    failed = 0
+    for backend, threshold in THRESHOLDS.items():
+        encoder = load_encoder(model_name, backend)
+        got = encoder.encode(TEXTS, convert_to_numpy=True)
+        cosine = np.sum(expected * got, axis=1)
+        status = "PASS" if cosine.min() >= threshold else "FAIL"
+        failed += status == "FAIL"
+        print(
+            f"  {backend:10} {single_query_ms(encoder):7.2f} ms/query   "
+            f"cosine min {cosine.min():.5f} mean {cosine.mean():.5f}   {status}"
+        )
+    return failed
+
+
+def run_tests():
+    failed = sum(test_model(model_name) for model_name in MODELS)
+    print(f"\n{'All backends match' if not failed else f'{failed} backend(s) FAILED'}")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if run_tests() else 0)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Parity check between vector_search and vector_search_batch
+Runs the same entity dicts one at a time and as one batch, with a cold
+query cache each time, and compares the hits. Then checks that the batch
+filled the cache: a second batch must encode nothing.
+Needs the FAISS indexes (scripts/generate_embeddings.py) and Neo4j.
+"""
+
+import time
+
+from modules.vector_retriever import (
+    clear_query_cache,
+    query_cache_info,
+    vector_search,
+    vector_search_batch,
+)
+
+ENTITIES = [
+    {"players": ["Mohamed Salah"], "seasons": ["2022-23"]},
+    {"players": ["Erling Haaland", "Harry Kane"], "statistics": ["goals_scored"]},
+    {"teams": ["Arsenal"], "positions": ["DEF"], "gameweeks": [10]},
+    {"players": ["Mohamed Salah"], "seasons": ["2022-23"]},  # repeat text
+    {"raw": "General football query"},
+]
+
+# Batched and single-text encodes may differ in the last float bits
+DISTANCE_TOLERANCE = 1e-4
+
+
+def hit_ids(result):
+    return [hit["faiss_index"] for hit in result["hits"]]
+
+
+def same_hits(single, batch):
+    if hit_ids(single) == hit_ids(batch):
+        return all(
+            abs(a["distance"] - b["distance"]) <= DISTANCE_TOLERANCE
+            for a, b in zip(single["hits"], batch["hits"])
+        )
+    # Near-equal distances may swap places: compare the scored sets instead
+    distances = {hit["faiss_index"]: hit["distance"] for hit in single["hits"]}
+    return all(
+        hit["faiss_index"] in distances
+        and abs(distances[hit["faiss_index"]] - hit["distance"]) <= DISTANCE_TOLERANCE
+        for hit in batch["hits"]
+    )
+
+
+def test_model(model_choice, top_k=5):
+    clear_query_cache()
+    start = time.perf_counter()
+    singles = [
+        vector_search(entities, top_k=top_k, model_choice=model_choice)
+        for entities in ENTITIES
+    ]
+    single_ms = (time.perf_counter() - start) * 1000
+
+    clear_query_cache()
+    start = time.perf_counter()
+    batch = vector_search_batch(ENTITIES, top_k=top_k, model_choice=model_choice)
+    batch_ms = (time.perf_counter() - start) * 1000
+    distinct = len({result["query_text"] for result in batch})
+    cold = query_cache_info()
+
+    again = vector_search_batch(ENTITIES, top_k=top_k, model_choice=model_choice)
+    warm = query_cache_info()
+
+    failures = 0
+    for entities, single, result in zip(ENTITIES, singles, batch):
+        ok = single["query_text"] == result["query_text"] and same_hits(single, result)
+        print(f"{'PASS' if ok else 'FAIL':6} model {model_choice} {entities}")
+        if not ok:
+            print(f"  single: {hit_ids(single)}")
+            print(f"  batch:  {hit_ids(result)}")
+            failures += 1
+
+    cache_ok = (
+        cold["misses"] == distinct
+        and warm["misses"] == cold["misses"]
+        and [hit_ids(r) for r in again] == [hit_ids(r) for r in batch]
+    )
+    print(
+        f"{'PASS' if cache_ok else 'FAIL':6} model {model_choice} cache: "
+        f"{cold['misses']} encodes for {distinct} distinct texts, "
+        f"{warm['misses'] - cold['misses']} on the repeat batch"
+    )
+    print(
+        f"       single {single_ms:8.1f} ms   batch {batch_ms:8.1f} ms "
+        f"({len(ENTITIES)} queries)\n"
+    )
+    return failures + (not cache_ok)
+
+
+def run_tests():
+    failed = sum(test_model(model_choice) for model_choice in ("A", "B"))
+    print("All checks passed" if not failed else f"{failed} checks failed")
+    return failed
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if run_tests() else 0)